@@ -7,24 +7,19 @@ Provides REST API for managing per-LED selection overrides.
 import logging
 from flask import Blueprint, request, jsonify
 from backend.logging_config import get_logger
-from backend.services.led_selection_service import LEDSelectionService
+from backend.services.led_selection_service import get_led_selection_service
 
 logger = get_logger(__name__)
 led_selection_bp = Blueprint('led_selection', __name__, url_prefix='/api/led-selection')
 
 
-def _get_selection_service(settings_service):
-    """Create a configured LED selection service."""
-    return LEDSelectionService(settings_service)
-
-
 @led_selection_bp.route('/key/<int:midi_note>', methods=['GET'])
 def get_key_selection(midi_note):
     """Get LED selection override for a specific key."""
     try:
         from backend.app import settings_service
         
-        service = _get_selection_service(settings_service)
+        service = get_led_selection_service(settings_service)
         result = service.get_key_led_selection(midi_note)
         
         return jsonify(result), 200 if result.get('success') else 400
@@ -43,7 +38,7 @@ def set_key_selection(midi_note):
         data = request.get_json() or {}
         selected_leds = data.get('selected_leds', [])
         
-        service = _get_selection_service(settings_service)
+        service = get_led_selection_service(settings_service)
         result = service.set_key_led_selection(midi_note, selected_leds)
         
         if result.get('success'):
@@ -60,13 +55,51 @@ def set_key_selection(midi_note):
         return jsonify({'success': False, 'error': str(e)}), 500
 
 
+@led_selection_bp.route('/keys', methods=['PUT'])
+def set_multiple_key_selections():
+    """Override LED selection for several keys at once (one settings write)."""
+    try:
+        from backend.app import settings_service, socketio
+        
+        data = request.get_json() or {}
+        raw_selections = data.get('selections', {})
+        if not isinstance(raw_selections, dict):
+            return jsonify({'success': False, 'error': 'selections must be an object'}), 400
+        
+        try:
+            selections = {int(midi_note): leds for midi_note, leds in raw_selections.items()}
+        except (TypeError, ValueError):
+            return jsonify({'success': False, 'error': 'selections keys must be MIDI note numbers'}), 400
+        
+        service = get_led_selection_service(settings_service)
+        result = service.set_multiple_key_selections(selections)
+        
+        if not result.get('saved'):
+            # Nothing was persisted, so there is no update to broadcast
+            return jsonify(result), 500
+        
+        for midi_note, key_result in result.get('results', {}).items():
+            if key_result.get('success'):
+                # Broadcast update
+                socketio.emit('led_selection_updated', {
+                    'midi_note': midi_note,
+                    'selected_leds': key_result.get('selected_leds')
+                })
+        
+        return jsonify(result), 200 if result.get('success') else 400
+    
+    except Exception as e:
+        logger.error(f"Error setting multiple LED selections: {e}")
+        return jsonify({'success': False, 'error': str(e)}), 500
+
+
 @led_selection_bp.route('/key/<int:midi_note>', methods=['DELETE'])
 def clear_key_selection(midi_note):
     """Clear LED selection override for a specific key."""
     try:
         from backend.app import settings_service, socketio
         
-        service = _get_selection_service(settings_service)
+        service = get_led_selection_service(settings_service)
         result = service.clear_key_led_selection(midi_note)
         
         if result.get('success'):
@@ -86,7 +119,7 @@ def toggle_led(midi_note, led_index):
     try:
         from backend.app import settings_service, socketio
         
-        service = _get_selection_service(settings_service)
+        service = get_led_selection_service(settings_service)
         result = service.toggle_led_selection(midi_note, led_index)
         
         if result.get('success'):
@@ -111,7 +144,7 @@ def get_all_selections():
     try:
         from backend.app import settings_service
         
-        service = _get_selection_service(settings_service)
+        service = get_led_selection_service(settings_service)
         overrides = service.get_all_overrides()
         
         # Convert to list format for frontend
@@ -140,7 +173,7 @@ def clear_all_selections():
     try:
         from backend.app import settings_service, socketio
         
-        service = _get_selection_service(settings_service)
+        service = get_led_selection_service(settings_service)
         result = service.clear_all_overrides()
         
         if result.get('success'):
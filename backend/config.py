@@ -1883,12 +1883,14 @@ def get_canonical_led_mapping(settings_service=None):
         )
         
         # Apply LED selection overrides (per-LED customization)
-        from backend.services.led_selection_service import LEDSelectionService
-        selection_service = LEDSelectionService(settings_service)
+        # The mapping was built for this call only, so it can be modified in place
+        from backend.services.led_selection_service import get_led_selection_service
+        selection_service = get_led_selection_service(settings_service)
         final_mapping = selection_service.apply_overrides_to_mapping(
             final_mapping,
             start_led=start_led,
-            end_led=end_led
+            end_led=end_led,
+            inplace=True
         )
         
         return {
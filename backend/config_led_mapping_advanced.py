@@ -22,6 +22,7 @@ Example: Key 0 → [4, 5, 6, 7, 8, 9, 10] (7 LEDs at start)
          Key 48 → [247, 248, 249] (3 LEDs at end, hardware-limited)
 """
 
+from collections import Counter
 from typing import Dict, List, Tuple
 from backend.config import (
     count_white_keys_for_piano,
@@ -235,7 +236,8 @@ def calculate_per_key_led_allocation(
             "black_keys_mapped": len(black_key_leds),
             "avg_leds_white_keys": sum(white_key_leds) / len(white_key_leds) if white_key_leds else 0,
             "avg_leds_black_keys": sum(black_key_leds) / len(black_key_leds) if black_key_leds else 0,
-            "leds_per_key_distribution": {},
+            # Histogram of LED counts, counted in one C-level pass
+            "leds_per_key_distribution": dict(Counter(leds_per_key_values)),
             "scale_factor": scale_factor,
             "led_coverage_mm": led_coverage_mm,
             "piano_width_mm": piano_width_mm,
@@ -243,11 +245,6 @@ def calculate_per_key_led_allocation(
             "key_width_mm": key_width_mm
         }
         
-        # Build distribution histogram
-        for led_count in leds_per_key_values:
-            stats["leds_per_key_distribution"][led_count] = \
-                stats["leds_per_key_distribution"].get(led_count, 0) + 1
-        
         # Identify edge keys
         if key_led_mapping:
             first_key = min(key_led_mapping.keys())
@@ -9,6 +9,7 @@ analysis with the main Piano LED Visualizer backend.
 """
 
 import math
+from functools import lru_cache
 from typing import Dict, List, Tuple, Any, Optional
 from dataclasses import dataclass
 from enum import Enum
@@ -563,6 +564,43 @@ class SymmetryAnalysis:
         return round(consistency, 4), description
 
 
+# Geometry and placements only depend on these primitive parameters, which rarely change
+# during a calibration session. Cached results are shared between calls: treat them as read-only.
+@lru_cache(maxsize=8)
+def cached_key_geometries(
+    white_key_width: float,
+    black_key_width: float,
+    white_key_gap: float,
+) -> Dict[int, KeyGeometry]:
+    """Geometry of all 88 keys for the given key dimensions."""
+    return PhysicalKeyGeometry.calculate_all_key_geometries(
+        white_key_width=white_key_width,
+        black_key_width=black_key_width,
+        white_key_gap=white_key_gap,
+    )
+
+
+@lru_cache(maxsize=8)
+def cached_led_placements(
+    led_spacing_mm: float,
+    led_physical_width: float,
+    led_strip_offset: float,
+    usable_led_count: int,
+) -> Dict[int, LEDPlacement]:
+    """Placements of the usable LEDs (relative indices from 0) at the given pitch."""
+    placement = LEDPhysicalPlacement(
+        led_physical_width=led_physical_width,
+        led_strip_offset=led_strip_offset,
+    )
+    placement.led_spacing_mm = led_spacing_mm
+    return placement.calculate_led_placements(
+        led_count=usable_led_count,
+        strip_start_mm=0.0,
+        start_led=0,
+        end_led=usable_led_count - 1,
+    )
+
+
 class PhysicalMappingAnalyzer:
     """
     Complete physical mapping analysis combining geometry, placement, and symmetry.
@@ -621,14 +659,14 @@ class PhysicalMappingAnalyzer:
         # Auto-calibrate pitch based on actual LED coverage vs theoretical
         from backend.services.led_pitch_auto_calibration import auto_calibrate_pitch
         
-        # Calculate piano dimensions from key geometries
-        key_geometries_temp = PhysicalKeyGeometry.calculate_all_key_geometries(
-            white_key_width=self.white_key_width,
-            black_key_width=self.black_key_width,
-            white_key_gap=self.white_key_gap,
+        # Calculate geometries (cached: also used for the per-key analysis below)
+        key_geometries = cached_key_geometries(
+            self.white_key_width, self.black_key_width, self.white_key_gap
         )
-        piano_start_mm = key_geometries_temp[0].start_mm
-        piano_end_mm = key_geometries_temp[87].end_mm
+        
+        # Calculate piano dimensions from key geometries
+        piano_start_mm = key_geometries[0].start_mm
+        piano_end_mm = key_geometries[87].end_mm
         
         # Get theoretical pitch from led_density
         theoretical_pitch = self.led_placement.led_spacing_mm
@@ -646,23 +684,22 @@ class PhysicalMappingAnalyzer:
         if was_adjusted:
             self.led_placement.led_spacing_mm = calibrated_pitch
 
-        # Calculate geometries
-        key_geometries = self.key_geometry.calculate_all_key_geometries(
-            white_key_width=self.white_key_width,
-            black_key_width=self.black_key_width,
-            white_key_gap=self.white_key_gap,
-        )
-
         # Calculate LED placements for usable range only
         # Using relative indices (0 to range_size-1) ensures correct spacing formula
-        # We calculate with indices starting at 0 for proper spacing calculation
+        # We calculate with indices starting at 0 for proper spacing calculation.
+        # Cached by pitch, so this reuses the placements the allocation service just built.
         usable_led_count = (end_led - start_led) + 1
-        led_placements = self.led_placement.calculate_led_placements(
-            led_count=usable_led_count,  # Number of LEDs in usable range
-            strip_start_mm=0.0,
-            start_led=0,  # Start from relative 0
-            end_led=usable_led_count - 1,  # End at relative count-1
+        relative_placements = cached_led_placements(
+            self.led_placement.led_spacing_mm,
+            self.led_placement.led_physical_width,
+            self.led_placement.led_strip_offset,
+            usable_led_count,
         )
+        # Re-key placements by absolute LED index once, so the per-key analysis below works
+        # on the mapping's absolute indices without translating back and forth
+        led_placements = {
+            rel_idx + start_led: placement for rel_idx, placement in relative_placements.items()
+        }
 
         # Analyze each key
         per_key_analysis = {}
@@ -678,6 +715,19 @@ class PhysicalMappingAnalyzer:
             "poor_alignment": 0,
         }
 
+        # Neighbor analysis, computed once per boundary: key k's next neighbor and key k+1's
+        # previous neighbor describe the same pair, so each key's LED set is built once and
+        # each (shared LEDs, consecutive) pair is shared by both records
+        key_led_sets = [set(key_led_mapping.get(key_idx, [])) for key_idx in range(88)]
+        boundaries = []
+        for key_idx in range(87):
+            curr_abs_indices = key_led_sets[key_idx]
+            next_abs_indices = key_led_sets[key_idx + 1]
+            consecutive = bool(curr_abs_indices and next_abs_indices) and (
+                max(curr_abs_indices) + 1 == min(next_abs_indices)
+            )
+            boundaries.append((sorted(curr_abs_indices & next_abs_indices), consecutive))
+
         total_symmetry = 0.0
         total_consistency = 0.0
         total_overhang_left = 0.0
@@ -686,22 +736,22 @@ class PhysicalMappingAnalyzer:
             key_geom = key_geometries[key_idx]
             # Get absolute LED indices from mapping
             abs_led_indices = key_led_mapping.get(key_idx, [])
-            # Convert to relative indices for calculations
-            rel_led_indices = [idx - start_led for idx in abs_led_indices if start_led <= idx <= end_led]
+            # Keep only LEDs in the usable range
+            led_indices = [idx for idx in abs_led_indices if start_led <= idx <= end_led]
 
-            # Calculate metrics using relative indices
+            # Calculate metrics (placements are keyed by absolute index)
             symmetry_score = self.symmetry.calculate_symmetry_score(
-                key_geom, rel_led_indices, led_placements
+                key_geom, led_indices, led_placements
             )
             symmetry_label = self.symmetry.get_symmetry_label(symmetry_score)
 
             consistency_score, consistency_label = (
-                self.symmetry.analyze_coverage_consistency(key_geom, rel_led_indices, led_placements)
+                self.symmetry.analyze_coverage_consistency(key_geom, led_indices, led_placements)
             )
 
             # Comprehensive coverage analysis (filters, overhang, coverage in one call)
             coverage_result = self.led_placement.analyze_led_coverage(
-                key_geom, rel_led_indices, led_placements, 
+                key_geom, led_indices, led_placements, 
                 overhang_threshold_mm=self.overhang_threshold_mm
             )
             
@@ -711,25 +761,22 @@ class PhysicalMappingAnalyzer:
             right_overhang = coverage_result["overhang_right_mm"]
 
             # Calculate LED gaps and detail information (matching piano.py output)
-            # Use filtered relative indices for output detail
             led_details = []
             if filtered_led_indices:
-                for i, rel_idx in enumerate(filtered_led_indices):
-                    # Convert back to absolute for output
-                    abs_idx = rel_idx + start_led
-                    if rel_idx in led_placements:
-                        led_placement = led_placements[rel_idx]
+                for i, led_idx in enumerate(filtered_led_indices):
+                    if led_idx in led_placements:
+                        led_placement = led_placements[led_idx]
                         led_detail = {
-                            "led_index": abs_idx,  # Output absolute index
+                            "led_index": led_idx,
                             "center_mm": round(led_placement.center_mm, 2),
                             "start_mm": round(led_placement.start_mm, 2),
                             "end_mm": round(led_placement.end_mm, 2),
                         }
                         # Add gap info from previous LED
                         if i > 0:
-                            prev_rel_idx = filtered_led_indices[i-1]
-                            if prev_rel_idx in led_placements:
-                                prev_led = led_placements[prev_rel_idx]
+                            prev_led_idx = filtered_led_indices[i-1]
+                            if prev_led_idx in led_placements:
+                                prev_led = led_placements[prev_led_idx]
                                 gap = led_placement.start_mm - prev_led.end_mm
                                 led_detail["gap_from_previous_mm"] = round(gap, 2)
                         led_details.append(led_detail)
@@ -740,33 +787,21 @@ class PhysicalMappingAnalyzer:
             
             # Analyze with previous key
             if key_idx > 0:
-                prev_abs_indices = set(key_led_mapping.get(key_idx - 1, []))
-                curr_abs_indices = set(abs_led_indices)
-                shared = prev_abs_indices.intersection(curr_abs_indices)
+                shared_leds, consecutive = boundaries[key_idx - 1]
                 neighbor_prev = {
                     "key_index": key_idx - 1,
-                    "shared_leds": sorted(list(shared)),
-                    "consecutive": False
+                    "shared_leds": list(shared_leds),
+                    "consecutive": consecutive
                 }
-                # Check if consecutive
-                if prev_abs_indices and curr_abs_indices:
-                    if max(prev_abs_indices) + 1 == min(curr_abs_indices):
-                        neighbor_prev["consecutive"] = True
 
             # Analyze with next key
             if key_idx < 87:
-                curr_abs_indices = set(abs_led_indices)
-                next_abs_indices = set(key_led_mapping.get(key_idx + 1, []))
-                shared = curr_abs_indices.intersection(next_abs_indices)
+                shared_leds, consecutive = boundaries[key_idx]
                 neighbor_next = {
                     "key_index": key_idx + 1,
-                    "shared_leds": sorted(list(shared)),
-                    "consecutive": False
+                    "shared_leds": shared_leds,
+                    "consecutive": consecutive
                 }
-                # Check if consecutive
-                if curr_abs_indices and next_abs_indices:
-                    if max(curr_abs_indices) + 1 == min(next_abs_indices):
-                        neighbor_next["consecutive"] = True
 
             # Build analysis record
             per_key_analysis[key_idx] = {
@@ -782,7 +817,7 @@ class PhysicalMappingAnalyzer:
                     "end": round(getattr(key_geom, '_exposed_end', key_geom.end_mm), 2),
                     "center": round(getattr(key_geom, '_exposed_center', key_geom.center_mm), 2)
                 },
-                "led_indices": [idx + start_led for idx in filtered_led_indices],  # Convert back to absolute
+                "led_indices": filtered_led_indices,
                 "led_count": len(filtered_led_indices),
                 "led_details": led_details,
                 "coverage_mm": round(coverage_amount, 2),
@@ -513,7 +513,9 @@ class LEDController:
         try:
             success = True
             error_messages = []
-            for index, color in led_data.items():
+            # Write pixels in strip order so the pixel buffer is filled front to back; callers
+            # such as the playback frame diff hand over LEDs in hash/merge order
+            for index, color in sorted(led_data.items()):
                 led_success, led_error = self.turn_on_led(index, color, auto_show=False)
                 if not led_success:
                     success = False
@@ -35,6 +35,40 @@ except ImportError:  # pragma: no cover - fallback for tests/tools
 
 logger = get_logger(__name__)
 
+# Pitch-class colors (C through B)
+_NOTE_COLORS = (
+    (255, 0, 0),
+    (255, 127, 0),
+    (255, 255, 0),
+    (127, 255, 0),
+    (0, 255, 0),
+    (0, 255, 127),
+    (0, 255, 255),
+    (0, 127, 255),
+    (0, 0, 255),
+    (127, 0, 255),
+    (255, 0, 255),
+    (255, 0, 127),
+)
+
+
+def _velocity_to_brightness(velocity: int) -> float:
+    min_brightness = 0.1
+    max_brightness = 1.0
+    normalized_velocity = max(0, min(velocity, 127)) / 127.0
+    return min_brightness + (normalized_velocity * (max_brightness - min_brightness))
+
+
+# Note colors pre-scaled by velocity brightness, indexed [velocity][note % 12], so a
+# note-on reads its final color instead of building it from the base color per event
+_VELOCITY_NOTE_COLORS = tuple(
+    tuple(
+        tuple(int(component * _velocity_to_brightness(velocity)) for component in color)
+        for color in _NOTE_COLORS
+    )
+    for velocity in range(128)
+)
+
 
 @dataclass
 class ProcessedMIDIEvent:
@@ -328,9 +362,7 @@ class MidiEventProcessor:
         if not led_indices:
             return None
 
-        color = self._get_note_color(note)
-        brightness = self._velocity_to_brightness(velocity)
-        final_color = tuple(int(component * brightness) for component in color)
+        final_color = _VELOCITY_NOTE_COLORS[max(0, min(velocity, 127))][note % 12]
 
         # Only update LEDs if update_leds is True (ignore keyboard input during playback)
         if self._led_controller and update_leds:
@@ -545,28 +577,11 @@ class MidiEventProcessor:
 
     @staticmethod
     def _get_note_color(note: int) -> tuple:
-        colors = [
-            (255, 0, 0),
-            (255, 127, 0),
-            (255, 255, 0),
-            (127, 255, 0),
-            (0, 255, 0),
-            (0, 255, 127),
-            (0, 255, 255),
-            (0, 127, 255),
-            (0, 0, 255),
-            (127, 0, 255),
-            (255, 0, 255),
-            (255, 0, 127),
-        ]
-        return colors[note % 12]
+        return _NOTE_COLORS[note % 12]
 
     @staticmethod
     def _velocity_to_brightness(velocity: int) -> float:
-        min_brightness = 0.1
-        max_brightness = 1.0
-        normalized_velocity = max(0, min(velocity, 127)) / 127.0
-        return min_brightness + (normalized_velocity * (max_brightness - min_brightness))
+        return _velocity_to_brightness(velocity)
 
     @property
     def controller_led_capacity(self) -> int:
@@ -6,13 +6,17 @@ Integrates MIDI parsing and LED control for real-time playback
 
 import logging
 import threading
+import queue
 import time
 import json
 import os
-from typing import Dict, List, Optional, Callable, Any, Tuple
+import math
+from functools import lru_cache
+from typing import Dict, List, Optional, Callable, Any, Tuple, Iterable, Sequence
 from dataclasses import dataclass, field
 from enum import Enum
-from collections import deque
+from array import array
+from bisect import bisect_left, bisect_right
 from backend.logging_config import get_logger
 
 logger = get_logger(__name__)
@@ -38,14 +42,43 @@ except ImportError:
     USBMIDIOutputService = None
 
 try:
-    from backend.config import get_config, get_piano_specs
+    from backend.config import get_config, get_piano_specs, get_canonical_led_mapping, generate_auto_key_mapping
 except ImportError:
     logging.warning("Config module not available, using defaults")
+    get_canonical_led_mapping = None
+    generate_auto_key_mapping = None
     def get_config(key, default):
         return default
     def get_piano_specs(piano_size):
         return {'keys': 88, 'midi_start': 21, 'midi_end': 108}
 
+# Note colors by position in the octave (C = index 0)
+_OCTAVE_COLORS = (
+    (255, 0, 0),    # C - Red
+    (255, 127, 0),  # C# - Orange
+    (255, 255, 0),  # D - Yellow
+    (127, 255, 0),  # D# - Yellow-Green
+    (0, 255, 0),    # E - Green
+    (0, 255, 127),  # F - Green-Cyan
+    (0, 255, 255),  # F# - Cyan
+    (0, 127, 255),  # G - Cyan-Blue
+    (0, 0, 255),    # G# - Blue
+    (127, 0, 255),  # A - Blue-Purple
+    (255, 0, 255),  # A# - Purple
+    (255, 0, 127),  # B - Purple-Red
+)
+
+@lru_cache(maxsize=128)
+def _hex_to_rgb(hex_color: str) -> tuple:
+    """Convert hex color string to RGB tuple (memoized; settings reuse the same few colors)."""
+    hex_color = hex_color.lstrip('#')
+    return tuple(int(hex_color[i:i+2], 16) for i in (0, 2, 4))
+
+@lru_cache(maxsize=128)
+def _dim_color(color: tuple, factor: float = 0.5) -> tuple:
+    """Scale an RGB tuple by factor (memoized)."""
+    return tuple(int(c * factor) for c in color)
+
 class PlaybackState(Enum):
     """Playback state enumeration"""
     IDLE = "idle"
@@ -73,6 +106,36 @@ class PlaybackStatus:
     progress_percentage: float
     error_message: Optional[str] = None
 
+class _MutableStatus:
+    """
+    Reusable status view handed to status callbacks.
+    
+    Same attributes as PlaybackStatus but updated in place on each notification
+    so the playback loop does not allocate a new status object per tick.
+    Callbacks that need to keep the values must call snapshot().
+    """
+    __slots__ = ('state', 'current_time', 'total_duration', 'filename',
+                 'progress_percentage', 'error_message')
+    
+    def __init__(self):
+        self.state = PlaybackState.IDLE
+        self.current_time = 0.0
+        self.total_duration = 0.0
+        self.filename = None
+        self.progress_percentage = 0.0
+        self.error_message = None
+    
+    def snapshot(self) -> PlaybackStatus:
+        """Return an immutable copy of the current values."""
+        return PlaybackStatus(
+            state=self.state,
+            current_time=self.current_time,
+            total_duration=self.total_duration,
+            filename=self.filename,
+            progress_percentage=self.progress_percentage,
+            error_message=self.error_message
+        )
+
 @dataclass
 class LearningDisplayState:
     """State for rendering learning mode LED display (PHASE A)"""
@@ -102,12 +165,130 @@ class LearningModeConfig:
     queue_max_age: float = 5.0
     flash_duration: float = 0.3
 
-@dataclass
-class QueuedNote:
-    """A MIDI note played by the user during learning mode (PHASE C)"""
-    note: int           # MIDI note number (0-127)
-    hand: str           # 'left' or 'right'
-    timestamp: float    # When it was played (playback time)
+class TimestampedNoteBuffer:
+    """
+    Bounded queue of (note, playback timestamp) pairs for one hand in learning mode.
+    
+    Notes and timestamps live in two parallel packed arrays with a moving head index,
+    so window queries and cleanup are binary searches over the timestamp column and
+    dropping old notes just advances the head (the dead prefix is compacted away
+    once it outgrows the live region). Timestamps are kept sorted.
+    """
+    
+    def __init__(self, maxlen: int = 5000):
+        self.maxlen = maxlen
+        self._times = array('d')
+        self._notes = array('h')
+        self._head = 0
+    
+    def __len__(self) -> int:
+        return len(self._times) - self._head
+    
+    def append(self, note: int, timestamp: float) -> None:
+        """Add a note; evicts the oldest entry when full."""
+        times = self._times
+        if len(times) > self._head and timestamp < times[-1]:
+            # Out-of-order timestamp: insert in place to keep the column sorted
+            pos = bisect_right(times, timestamp, self._head)
+            times.insert(pos, timestamp)
+            self._notes.insert(pos, note)
+        else:
+            times.append(timestamp)
+            self._notes.append(note)
+        if len(self) > self.maxlen:
+            self._head += 1
+            self._maybe_compact()
+    
+    def window(self, start: float, end: float) -> List[int]:
+        """Notes with start <= timestamp <= end, oldest first."""
+        lo = bisect_left(self._times, start, self._head)
+        hi = bisect_right(self._times, end, lo)
+        return self._notes[lo:hi].tolist()
+    
+    def drop_before(self, cutoff: float) -> int:
+        """Drop notes older than cutoff; returns how many were removed."""
+        new_head = bisect_left(self._times, cutoff, self._head)
+        removed = new_head - self._head
+        self._head = new_head
+        self._maybe_compact()
+        return removed
+    
+    def discard_notes(self, notes_mask: int) -> int:
+        """Remove every entry whose note bit is set in notes_mask; returns how many were removed."""
+        head = self._head
+        kept = [i for i in range(head, len(self._times)) if not (notes_mask >> self._notes[i]) & 1]
+        removed = len(self) - len(kept)
+        if removed:
+            self._times = array('d', [self._times[i] for i in kept])
+            self._notes = array('h', [self._notes[i] for i in kept])
+            self._head = 0
+        return removed
+    
+    def latest(self, count: int) -> List[Tuple[int, float]]:
+        """The newest count entries as (note, timestamp) pairs, oldest first."""
+        start = max(self._head, len(self._times) - count)
+        return list(zip(self._notes[start:], self._times[start:]))
+    
+    def clear(self) -> None:
+        del self._times[:]
+        del self._notes[:]
+        self._head = 0
+    
+    def _maybe_compact(self) -> None:
+        head = self._head
+        if head >= 1024 and head * 2 >= len(self._times):
+            del self._times[:head]
+            del self._notes[:head]
+            self._head = 0
+
+def _due_event_range(ev_time: array, idx: int, current_time: float, tolerance: float = 0.02) -> Tuple[int, int]:
+    """
+    Events due at current_time, given the sorted start-time column and the cursor idx.
+    
+    Returns (first, end): events [idx, end) have started (time < current_time + tolerance)
+    and the cursor should move to end; of those, only [first, end) are recent enough to
+    fire - earlier ones were passed over (e.g. a stalled tick) and are skipped.
+    """
+    end = bisect_left(ev_time, current_time + tolerance, idx)
+    if end == idx:
+        return idx, idx
+    return bisect_right(ev_time, current_time - tolerance, idx, end), end
+
+def _led_runs(led_indices: Tuple[int, ...]) -> Tuple[Tuple[int, int, int], ...]:
+    """
+    Group LED indices into contiguous runs for slice writes into an RGB frame buffer.
+    
+    Returns:
+        (byte_start, byte_end, led_count) per run of consecutive LED indices
+    """
+    runs = []
+    start = prev = None
+    for led in led_indices:
+        if prev is not None and led == prev + 1:
+            prev = led
+            continue
+        if start is not None:
+            runs.append((start * 3, (prev + 1) * 3, prev + 1 - start))
+        start = prev = led
+    if start is not None:
+        runs.append((start * 3, (prev + 1) * 3, prev + 1 - start))
+    return tuple(runs)
+
+def _note_mask(notes) -> int:
+    """Pack MIDI note numbers (0-127) into a bitmask (bit n => note n)."""
+    mask = 0
+    for note in notes:
+        mask |= 1 << note
+    return mask
+
+def _mask_to_notes(mask: int) -> set:
+    """Expand a note bitmask (bit n => MIDI note n) into a set of note numbers."""
+    notes = set()
+    while mask:
+        low_bit = mask & -mask
+        notes.add(low_bit.bit_length() - 1)
+        mask ^= low_bit
+    return notes
 
 class PlaybackService:
     """Service for coordinating MIDI playback with LED visualization"""
@@ -134,13 +315,32 @@ class PlaybackService:
             self._load_settings_from_config(num_leds_override=num_leds)
         
         # Precompute key-to-LED mapping for performance
+        # OPTIMIZATION: Canonical (calibrated) mapping cached per settings version
+        self._canonical_mapping_cache: Dict[int, Tuple[int, ...]] = {}
+        self._canonical_mapping_version: Optional[int] = None
+        # OPTIMIZATION: Mapping mode resolved with one dict lookup instead of a string-compare chain
+        self._mapping_generators: Dict[str, Callable[[], Dict[int, Tuple[int, ...]]]] = {
+            'manual': self._gen_manual_mapping,
+            'auto': self._gen_auto_mapping,
+            'proportional': self._gen_auto_mapping,
+        }
+        self._single_led_table = self._build_single_led_table()
+        self._specialized_mapper = self._build_specialized_mapper()
         self._precomputed_mapping = self._generate_key_mapping()
+        self._build_mapping_csr()
         self._midi_parser = midi_parser or (MIDIParser(settings_service=settings_service) if MIDIParser else None)
         
         # OPTIMIZATION: Pre-computed expected notes lookup (Phase 2A)
-        # Dictionary maps (time_bin, hand) -> set(notes) for O(1) lookups instead of O(n) iteration
-        self._expected_notes_by_window: Dict[Tuple[int, str], set] = {}
-        self._expected_notes_window_size = 50  # Time bins in milliseconds for grouping
+        # Per-bin note bitmasks in one contiguous uint64 buffer, sized once per load.
+        # Layout: 4 words per time bin -> [left lo, left hi, right lo, right hi], where
+        # "lo" holds notes 0-63 and "hi" notes 64-127 (bit n of the 128-bit pair => note n).
+        # Word index for (time_bin, hand, word) is time_bin * 4 + hand * 2 + word.
+        # Bins have a fixed width independent of the timing window, so they never need
+        # rebuilding when learning settings (or tempo) change.
+        self._expected_mask_buf = array('Q')
+        self._expected_mask_bins = 0
+        self._expected_notes_window_size = 100  # Time bin width in milliseconds for grouping
+        self._expected_bin_inv_seconds = 1000.0 / self._expected_notes_window_size
         
         # OPTIMIZATION: Cached color conversions (Phase 2A)
         self._left_color_bright = None
@@ -149,10 +349,13 @@ class PlaybackService:
         self._right_color_dim = None
         
         # OPTIMIZATION: Cached note-to-LED lookups (Phase 2A)
-        self._note_to_leds_cache: Dict[int, List[int]] = {}
+        # Flat table indexed directly by MIDI note (0-127); unmapped notes hold an empty tuple
+        self._note_to_leds: List[Tuple[int, ...]] = [()] * 128
+        self._note_led_runs: List[Tuple[Tuple[int, int, int], ...]] = [()] * 128  # Frame slices per note
         
         # OPTIMIZATION: Batch LED update state tracking (Phase 2A)
-        self._last_led_state: Dict[int, tuple] = {}
+        # Frames are flat RGB bytearrays (3 bytes per LED) so an unchanged frame is a single memcmp
+        self._reset_led_frames()
         
         # OPTIMIZATION: Learning mode check frequency reduction (Phase 2B)
         self._last_learning_mode_check = 0.0
@@ -165,19 +368,53 @@ class PlaybackService:
         self._total_duration = 0.0
         self._filename = None
         self._note_events: List[NoteEvent] = []
-        self._active_notes: Dict[int, float] = {}  # note -> end_time
+        # OPTIMIZATION: Structure-of-arrays view of _note_events for the hot paths, rebuilt on load
+        # (NoteEvent objects are kept for the public `notes` API)
+        self._ev_time = array('d')
+        self._ev_end = array('d')
+        self._ev_duration = array('d')
+        self._ev_note = array('h')
+        self._ev_velocity = array('h')
+        # OPTIMIZATION: Index of the next event to fire; only moves forward except on seek/loop
+        self._next_event_idx = 0
+        # OPTIMIZATION: Sounding notes as a 128-bit mask (bit n => note n) plus a fixed
+        # 128-slot end-time column, instead of a dict keyed by note number
+        self._active_mask = 0
+        self._active_end = array('d', bytes(8 * 128))  # note -> end_time (valid while its bit is set)
+        self._next_note_end = math.inf  # Earliest end_time among sounding notes
         
         # Threading
         self._playback_thread: Optional[threading.Thread] = None
         self._stop_event = threading.Event()
         self._pause_event = threading.Event()
+        # OPTIMIZATION: LED frames are rendered on a worker thread fed through a single-slot
+        # queue, so slow LED backends never stretch the note timing of the playback loop
+        self._led_frame_queue: queue.Queue = queue.Queue(maxsize=1)
+        self._led_worker_thread: Optional[threading.Thread] = None
+        self._led_frame_lock = threading.Lock()  # Guards the LED frame buffers across threads
+        # OPTIMIZATION: While playing, LED changes are handed to a writer thread that owns the
+        # controller I/O; pending changes are merged (newest color wins) rather than queued
+        self._led_pending: Dict[int, tuple] = {}
+        self._led_pending_lock = threading.Lock()
+        self._led_pending_event = threading.Event()
+        self._led_io_lock = threading.Lock()  # Held by whoever is talking to the LED controller
+        self._led_writer_thread: Optional[threading.Thread] = None
+        self._led_writer_active = False
         
         # Callbacks for real-time updates
         self._status_callbacks: List[Callable[[PlaybackStatus], None]] = []
-        
-        # Timing precision
-        self._start_time = 0.0
-        self._pause_time = 0.0
+        self._status_view = _MutableStatus()  # Pooled status passed to callbacks
+        # OPTIMIZATION: Callbacks run on a background notifier thread; _notify_status_change only
+        # marks the status dirty, so subscriber I/O never blocks the playback loop
+        self._status_dirty = threading.Event()
+        self._status_stop = threading.Event()  # Set by cleanup() to end the notifier thread
+        self._status_thread: Optional[threading.Thread] = None
+        self._status_thread_lock = threading.Lock()
+        
+        # Timing precision: playback clock anchors in integer monotonic nanoseconds
+        # (immune to wall-clock steps); _current_time stays in seconds for the API
+        self._start_ns = 0
+        self._pause_ns = 0
         
         # New Story 1.8 features
         self._tempo_multiplier = 1.0  # 1.0 = normal speed, 0.5 = half speed, 2.0 = double speed
@@ -188,7 +425,8 @@ class PlaybackService:
         
         # MIDI output configuration
         self._midi_output_enabled = False
-        self._midi_notes_sent: Dict[int, bool] = {}  # Track which MIDI notes are currently on
+        # OPTIMIZATION: Bitmask of MIDI notes currently on at the output (bit n => note n)
+        self._midi_on_mask = 0
         
         # Learning mode configuration (PHASE B: unified)
         self._learning_config = LearningModeConfig(
@@ -199,17 +437,27 @@ class PlaybackService:
             queue_max_age=5.0,
             flash_duration=0.3
         )
-        
-        # Unified timestamped queue: [QueuedNote(...), ...] - tracks notes with when they were played (PHASE C)
-        # Bounded deque prevents unbounded memory growth (max 5000 notes, FIFO auto-eviction)
-        # QueuedNote contains: note (0-127), hand ('left'/'right'), timestamp (playback time)
-        self._note_queue: deque = deque(maxlen=5000)
+        # OPTIMIZATION: Timing window in seconds, cached on assignment
+        self._set_timing_window_ms(self._learning_config.timing_window_ms)
+        # OPTIMIZATION: Wait flags indexed by hand (0 = left, 1 = right) and the hands that wait
+        self._hand_wait: Tuple[bool, bool] = (False, False)
+        self._waiting_hands: Tuple[int, ...] = ()
+        
+        # Timestamped played-note queues, one per hand (0 = left, 1 = right) - tracks notes with
+        # when they were played (PHASE C). Bounded (max 5000 notes each, oldest evicted first);
+        # timestamps are playback time
+        self._hand_queues: Tuple[TimestampedNoteBuffer, TimestampedNoteBuffer] = (
+            TimestampedNoteBuffer(maxlen=5000), TimestampedNoteBuffer(maxlen=5000)
+        )
+        self._queue_cleanup_interval = 1.0  # Seconds (monotonic clock) between stale-note cleanups
+        self._last_queue_cleanup = 0.0
         self._expected_notes: Dict[str, set] = {'left': set(), 'right': set()}  # Expected notes for current time window
         
         # Wrong note flash timing
         self._last_wrong_flash_time = -1.0  # When the wrong note flash was triggered (initialized to expired time)
         self._wrong_flash_triggered_this_window = False  # Flag to prevent rapid timer resets on consecutive wrong notes
-        self._last_expected_notes: set = set()  # Track expected notes to detect window changes
+        self._last_expected_mask = 0  # Bitmask of expected notes, to detect window changes
+        self._lm_log_counter = 0  # Learning-mode check counter; state is logged every 10th check
         
         # Load MIDI output settings
         self._load_midi_output_settings()
@@ -219,6 +467,7 @@ class PlaybackService:
         
         # OPTIMIZATION: Initialize color cache (Phase 2A)
         self._refresh_color_cache()
+        self._rebuild_note_color_lut()
         
         # OPTIMIZATION: Pre-build note-to-LED cache (Phase 2A)
         self._prebuild_note_to_leds_cache()
@@ -235,11 +484,43 @@ class PlaybackService:
         
         logger.info(f"PlaybackService initialized with {self.num_leds} LEDs, MIDI output: {self._midi_output_enabled}")
     
+    def _bulk_setting_getter(self) -> Optional[Callable[..., Any]]:
+        """
+        OPTIMIZATION: Return a get_setting-compatible reader that fetches each category once
+        (get_category_settings) and answers every key of it from that dict, instead of one
+        settings query per key.
+        
+        Falls back to per-key get_setting for services without a usable category fetch,
+        and returns None when the service has no get_setting at all.
+        """
+        get_setting = getattr(self._settings_service, 'get_setting', None)
+        if not callable(get_setting):
+            return None
+        get_category_settings = getattr(self._settings_service, 'get_category_settings', None)
+        if not callable(get_category_settings):
+            return get_setting
+        
+        categories: Dict[str, Optional[Dict[str, Any]]] = {}
+        
+        def get_cached_setting(category: str, key: str, default: Any = None) -> Any:
+            try:
+                values = categories[category]
+            except KeyError:
+                values = get_category_settings(category)
+                if not isinstance(values, dict) or not values:
+                    values = None  # Unusable or failed fetch: read this category key by key
+                categories[category] = values
+            if values is None:
+                return get_setting(category, key, default)
+            return values.get(key, default)
+        
+        return get_cached_setting
+    
     def _load_settings_from_service(self, num_leds_override: Optional[int] = None) -> None:
         """Load runtime configuration from the settings service."""
         piano_config_getter = getattr(self._settings_service, 'get_piano_configuration', None)
         led_config_getter = getattr(self._settings_service, 'get_led_configuration', None)
-        get_setting = getattr(self._settings_service, 'get_setting', None)
+        get_setting = self._bulk_setting_getter()
 
         piano_config = piano_config_getter() if callable(piano_config_getter) else {}
         if not isinstance(piano_config, dict):
@@ -297,7 +578,7 @@ class PlaybackService:
             return
 
         try:
-            get_setting = getattr(self._settings_service, 'get_setting', None)
+            get_setting = self._bulk_setting_getter()
             if callable(get_setting):
                 self._midi_output_enabled = get_setting('hardware', 'midi_output_enabled', False)
                 midi_output_device = get_setting('hardware', 'midi_output_device', '')
@@ -322,16 +603,19 @@ class PlaybackService:
             return
 
         try:
-            get_setting = getattr(self._settings_service, 'get_setting', None)
+            get_setting = self._bulk_setting_getter()
             if callable(get_setting):
                 self._learning_config.wait_for_left = get_setting('learning_mode', 'left_hand_wait_for_notes', False)
                 self._learning_config.wait_for_right = get_setting('learning_mode', 'right_hand_wait_for_notes', False)
-                self._learning_config.timing_window_ms = get_setting('learning_mode', 'timing_window_ms', 500)
+                self._set_timing_window_ms(get_setting('learning_mode', 'timing_window_ms', 500))
                 self._learning_config.queue_max_age = get_setting('learning_mode', 'queue_max_age', 5.0)
                 self._learning_config.flash_duration = get_setting('learning_mode', 'flash_duration', 0.3)
                 
+                self._hand_wait = (bool(self._learning_config.wait_for_left), bool(self._learning_config.wait_for_right))
+                self._waiting_hands = tuple(hand for hand, wait in enumerate(self._hand_wait) if wait)
+                
                 # Learning mode is enabled if either hand has wait_for_notes enabled
-                self._learning_config.enabled = self._learning_config.wait_for_left or self._learning_config.wait_for_right
+                self._learning_config.enabled = bool(self._waiting_hands)
                 
                 if self._learning_config.enabled:
                     logger.info(f"Learning mode enabled - Left hand: {self._learning_config.wait_for_left}, Right hand: {self._learning_config.wait_for_right}, Timing: {self._learning_config.timing_window_ms}ms")
@@ -341,6 +625,24 @@ class PlaybackService:
             logger.error(f"Error loading learning mode settings: {e}")
             self._learning_config.enabled = False
 
+    def _set_timing_window_ms(self, value: Any) -> None:
+        """
+        Set the learning mode timing window and cache derived per-tick scalars.
+        
+        Keeps _timing_window_seconds in sync so the learning-mode check does not
+        convert from milliseconds on every call.
+        """
+        try:
+            timing_window_ms = float(value)
+        except (TypeError, ValueError):
+            timing_window_ms = 0.0
+        if timing_window_ms <= 0:
+            logger.warning(f"Invalid timing_window_ms {value!r}, using 500ms")
+            value = timing_window_ms = 500
+        
+        self._learning_config.timing_window_ms = value
+        self._timing_window_seconds = timing_window_ms / 1000.0
+
     def _load_settings_from_config(self, num_leds_override: Optional[int] = None) -> None:
         """Fallback configuration loading from static config values."""
         piano_size = get_config('piano_size', '88-key')
@@ -367,7 +669,13 @@ class PlaybackService:
         else:
             self._load_settings_from_config()
 
+        self._single_led_table = self._build_single_led_table()
+        self._specialized_mapper = self._build_specialized_mapper()
         self._precomputed_mapping = self._generate_key_mapping()
+        self._build_mapping_csr()
+        self._prebuild_note_to_leds_cache()
+        self._prebuild_led_to_notes_cache()
+        self._reset_led_frames()
         self._load_midi_output_settings()
         self._load_learning_mode_settings()
         logger.debug(
@@ -406,12 +714,12 @@ class PlaybackService:
                 right_white_hex = '#006496'
             
             # Convert hex to RGB once and cache
-            self._left_color_bright = self._hex_to_rgb(left_white_hex)
-            self._right_color_bright = self._hex_to_rgb(right_white_hex)
+            self._left_color_bright = _hex_to_rgb(left_white_hex)
+            self._right_color_bright = _hex_to_rgb(right_white_hex)
             
             # Pre-compute dim versions (50% brightness)
-            self._left_color_dim = tuple(int(c * 0.5) for c in self._left_color_bright)
-            self._right_color_dim = tuple(int(c * 0.5) for c in self._right_color_bright)
+            self._left_color_dim = _dim_color(self._left_color_bright, 0.5)
+            self._right_color_dim = _dim_color(self._right_color_bright, 0.5)
             
             logger.debug(f"Color cache refreshed: L={self._left_color_bright}, R={self._right_color_bright}")
         except Exception as e:
@@ -422,10 +730,40 @@ class PlaybackService:
             self._left_color_dim = (127, 53, 53)
             self._right_color_dim = (0, 50, 75)
     
-    def _hex_to_rgb(self, hex_color: str) -> tuple:
-        """Convert hex color string to RGB tuple."""
-        hex_color = hex_color.lstrip('#')
-        return tuple(int(hex_color[i:i+2], 16) for i in (0, 2, 4))
+    def _build_mapping_csr(self) -> None:
+        """
+        OPTIMIZATION: Flatten _precomputed_mapping into CSR-style arrays.
+        
+        _mapping_leds holds every note's bounds-filtered LED indices back to back and
+        _mapping_offsets[note]:_mapping_offsets[note + 1] delimits one note's slice, so a
+        lookup is one contiguous array slice instead of a dict probe plus a filtering pass.
+        """
+        num_leds = self.num_leds
+        mapping = self._precomputed_mapping
+        offsets = array('i', [0]) * 129
+        leds = array('i')
+        for note in range(128):
+            led_indices = mapping.get(note)
+            if led_indices:
+                # OPTIMIZATION: In-range LED lists (the common case) are copied in one C-level
+                # extend; only lists with out-of-range indices are filtered element by element
+                if min(led_indices) >= 0 and max(led_indices) < num_leds:
+                    leds.extend(led_indices)
+                else:
+                    leds.extend(idx for idx in led_indices if 0 <= idx < num_leds)
+            offsets[note + 1] = len(leds)
+        self._mapping_offsets = offsets
+        self._mapping_leds = leds
+        
+        # OPTIMIZATION: With one LED per key (every note's slice holds at most one index),
+        # _map_note_to_leds serves lookups from a flat table of 1-tuples (None = CSR lookup)
+        if leds and all(offsets[note + 1] - offsets[note] <= 1 for note in range(128)):
+            self._single_note_leds = tuple(
+                (leds[offsets[note]],) if offsets[note] != offsets[note + 1] else ()
+                for note in range(128)
+            )
+        else:
+            self._single_note_leds = None
     
     def _prebuild_note_to_leds_cache(self) -> None:
         """
@@ -433,29 +771,30 @@ class PlaybackService:
         Avoids repeated lookups during playback.
         """
         try:
-            self._note_to_leds_cache.clear()
-            for note in range(self.min_midi_note, self.max_midi_note + 1):
-                # Use precomputed mapping if available
-                if note in self._precomputed_mapping:
-                    led_indices = self._precomputed_mapping[note]
-                    valid_indices = [idx for idx in led_indices if 0 <= idx < self.num_leds]
-                    if valid_indices:
-                        self._note_to_leds_cache[note] = valid_indices
-                        continue
+            table: List[Tuple[int, ...]] = [()] * 128
+            offsets = self._mapping_offsets
+            leds = self._mapping_leds
+            for note in range(max(0, self.min_midi_note), min(127, self.max_midi_note) + 1):
+                # Use precomputed mapping if available (already bounds-filtered)
+                start, end = offsets[note], offsets[note + 1]
+                if start != end:
+                    table[note] = tuple(leds[start:end])
+                    continue
                 
                 # Fallback to single LED mapping
-                single_led = self._map_note_to_led(note)
-                if 0 <= single_led < self.num_leds:
-                    self._note_to_leds_cache[note] = [single_led]
+                table[note] = self._specialized_mapper(note)
             
-            logger.debug(f"Built note-to-LED cache for {len(self._note_to_leds_cache)} notes")
+            self._note_to_leds = table
+            # Contiguous LED runs per note, so rendering writes one frame slice per run
+            self._note_led_runs = [_led_runs(leds) for leds in table]
+            logger.debug(f"Built note-to-LED table for {sum(1 for leds in table if leds)} notes")
         except Exception as e:
             logger.error(f"Error building note-to-LED cache: {e}")
     
     def _prebuild_led_to_notes_cache(self) -> None:
         """
         OPTIMIZATION: Build reverse mapping - LED index to notes using that LED (PHASE B).
-        Inverse of _note_to_leds_cache for faster LED-based highlighting.
+        Inverse of _note_to_leds for faster LED-based highlighting.
         
         This enables: for each LED, get all notes that use it.
         """
@@ -463,8 +802,7 @@ class PlaybackService:
             self._led_to_notes_cache: Dict[int, List[int]] = {}
             
             for note in range(self.min_midi_note, self.max_midi_note + 1):
-                led_indices = self._note_to_leds_cache.get(note, [])
-                for led_idx in led_indices:
+                for led_idx in self._note_to_leds[note]:
                     if led_idx not in self._led_to_notes_cache:
                         self._led_to_notes_cache[led_idx] = []
                     self._led_to_notes_cache[led_idx].append(note)
@@ -478,81 +816,319 @@ class PlaybackService:
         OPTIMIZATION: Pre-compute expected notes grouped by time windows for O(1) lookup.
         Called after loading MIDI file.
         
-        Builds dictionary: {(time_bin, hand): set(notes)}
+        Fills _expected_mask_buf with one 128-bit note mask per (time_bin, hand).
         """
         try:
-            self._expected_notes_by_window.clear()
+            self._expected_mask_bins = 0
             
             if not self._note_events:
+                self._expected_mask_buf = array('Q')
                 return
             
-            # Group events by time bins (windows) and hand
-            timing_window_seconds = self._learning_config.timing_window_ms / 1000.0
+            self._ensure_event_arrays()
             
-            for event in self._note_events:
+            # Group events by fixed-width time bins and hand
+            inv_window = self._expected_bin_inv_seconds
+            num_bins = int(max(self._ev_time) * inv_window) + 1
+            buf = array('Q', bytes(8 * 4 * num_bins))
+            
+            for start, note in zip(self._ev_time, self._ev_note):
+                if not 0 <= note < 128 or start < 0:
+                    continue
                 # Determine hand (left < 60, right >= 60)
-                hand = 'left' if event.note < 60 else 'right'
+                hand = 0 if note < 60 else 1
                 
-                # Calculate time bin (integer index based on timing window)
-                time_bin = int(event.time / timing_window_seconds)
+                # Calculate time bin (integer index based on bin width)
+                time_bin = int(start * inv_window)
                 
-                # Create key and add to dictionary
-                key = (time_bin, hand)
-                if key not in self._expected_notes_by_window:
-                    self._expected_notes_by_window[key] = set()
-                self._expected_notes_by_window[key].add(event.note)
+                buf[time_bin * 4 + hand * 2 + (note >> 6)] |= 1 << (note & 63)
             
-            logger.info(f"Pre-computed expected notes: {len(self._expected_notes_by_window)} time windows")
+            self._expected_mask_buf = buf
+            self._expected_mask_bins = num_bins
+            logger.info(f"Pre-computed expected notes: {num_bins} time windows")
         except Exception as e:
             logger.error(f"Error pre-computing expected notes: {e}")
     
     def _get_expected_notes_fast(self, window_start: float, window_end: float) -> Tuple[set, set]:
+        """Set view of _get_expected_masks_fast: (expected_left_notes, expected_right_notes)."""
+        left_mask, right_mask = self._get_expected_masks_fast(window_start, window_end)
+        return _mask_to_notes(left_mask), _mask_to_notes(right_mask)
+    
+    def _get_expected_masks_fast(self, window_start: float, window_end: float) -> Tuple[int, int]:
         """
-        OPTIMIZATION: Fast lookup of expected notes using pre-computed dictionary.
-        Replaces O(n) iteration with O(k) where k = number of time bins in range (typically 1-2).
+        OPTIMIZATION: Fast lookup of expected notes using pre-computed bin masks.
+        Replaces O(n) iteration with O(k) where k = number of 100ms bins in range (~15 for the
+        learning window), with no per-event comparisons;
+        masks are OR-ed together into one 128-bit note mask per hand.
         
         Args:
             window_start: Start time of window
             window_end: End time of window
             
         Returns:
-            Tuple of (expected_left_notes, expected_right_notes)
+            Tuple of (expected_left_mask, expected_right_mask)
         """
-        timing_window_seconds = self._learning_config.timing_window_ms / 1000.0
-        start_bin = int(window_start / timing_window_seconds)
-        end_bin = int(window_end / timing_window_seconds) + 1  # Include partial bins
+        inv_window = self._expected_bin_inv_seconds
+        start_bin = max(0, int(window_start * inv_window))
+        # Last bin that starts before window_end (covers the partial bin at the end)
+        end_bin = min(self._expected_mask_bins - 1, math.ceil(window_end * inv_window) - 1)
         
-        expected_left = set()
-        expected_right = set()
+        buf = self._expected_mask_buf
+        left_lo = left_hi = right_lo = right_hi = 0
         
         # Collect notes from all relevant time bins
-        for time_bin in range(start_bin, end_bin + 1):
-            if (time_bin, 'left') in self._expected_notes_by_window:
-                expected_left.update(self._expected_notes_by_window[(time_bin, 'left')])
-            if (time_bin, 'right') in self._expected_notes_by_window:
-                expected_right.update(self._expected_notes_by_window[(time_bin, 'right')])
+        for base in range(start_bin * 4, end_bin * 4 + 1, 4):
+            left_lo |= buf[base]
+            left_hi |= buf[base + 1]
+            right_lo |= buf[base + 2]
+            right_hi |= buf[base + 3]
         
-        return expected_left, expected_right
+        return left_lo | left_hi << 64, right_lo | right_hi << 64
+    
+    def _get_expected_notes_exact(self, window_start: float, window_end: float) -> Tuple[set, set]:
+        """Set view of _get_expected_masks_exact: (expected_left_notes, expected_right_notes)."""
+        left_mask, right_mask = self._get_expected_masks_exact(window_start, window_end)
+        return _mask_to_notes(left_mask), _mask_to_notes(right_mask)
     
-    def _map_note_to_leds_cached(self, note: int) -> List[int]:
+    def _get_expected_masks_exact(self, window_start: float, window_end: float) -> Tuple[int, int]:
+        """
+        OPTIMIZATION: Expected notes for notes that START within [window_start, window_end).
+        Start times are sorted, so two binary searches give exactly the events in the
+        window; only that slice is touched instead of every event in the song.
+        
+        Args:
+            window_start: Start time of window
+            window_end: End time of window
+            
+        Returns:
+            Tuple of (expected_left_mask, expected_right_mask)
+        """
+        self._ensure_event_arrays()
+        ev_time = self._ev_time
+        lo = bisect_left(ev_time, window_start)
+        hi = bisect_left(ev_time, window_end, lo)
+        
+        # Left hand is below Middle C (60): split the combined mask at bit 60
+        mask = _note_mask(self._ev_note[lo:hi])
+        return mask & ((1 << 60) - 1), mask >> 60 << 60
+    
+    def _map_note_to_leds_cached(self, note: int) -> Tuple[int, ...]:
         """
         OPTIMIZATION: Use cached note-to-LED lookups instead of computing each time.
+        Single list index into the per-note table; no hashing, no copy.
         
         Args:
             note: MIDI note number
             
         Returns:
-            List of LED indices for this note
+            Tuple of LED indices for this note (empty if unmapped)
+        """
+        if 0 <= note < 128:
+            return self._note_to_leds[note]
+        return ()
+    
+    def _reset_event_cursor(self) -> None:
         """
-        return self._note_to_leds_cache.get(note, [])
+        OPTIMIZATION: Re-position the event cursor for the current playback time.
+        Binary search over the packed start times; called on start, seek and loop jumps.
+        """
+        self._ensure_event_arrays()
+        self._next_event_idx = bisect_left(self._ev_time, self._current_time - 0.02)
+    
+    def _ensure_event_arrays(self) -> None:
+        """Rebuild the event arrays if _note_events was replaced without going through a load."""
+        if len(self._ev_time) != len(self._note_events):
+            self._rebuild_event_arrays()
+    
+    def _rebuild_event_arrays(self) -> None:
+        """
+        OPTIMIZATION: Build contiguous structure-of-arrays columns from _note_events.
+        Lets the playback loop, duration and time-window queries run over packed
+        values instead of touching NoteEvent attributes one by one.
+        """
+        events = self._note_events
+        self._ev_time = array('d', [event.time for event in events])
+        self._ev_duration = array('d', [event.duration for event in events])
+        self._ev_end = array('d', [event.time + event.duration for event in events])
+        self._ev_note = array('h', [event.note for event in events])
+        self._ev_velocity = array('h', [event.velocity for event in events])
     
     # ==================== END OPTIMIZATION METHODS ====================
     
+    def _warmup_caches(self) -> None:
+        """
+        OPTIMIZATION: Touch the per-note lookup tables and event columns once before the
+        playback thread starts, so the first frames do not pay for first access to them.
+        The aggregate is kept on the instance so the reads are not optimized away.
+        """
+        sink = 0
+        note_to_leds = self._note_to_leds
+        note_led_runs = self._note_led_runs
+        color_lut = self._note_color_lut
+        for note in range(128):
+            leds = note_to_leds[note]
+            sink += len(leds) + len(note_led_runs[note]) + color_lut[note][0]
+            if leds:
+                sink += leds[0]
+        sink += len(self._mapping_leds) + len(self._expected_mask_buf)
+        if self._ev_time:
+            sink += int(self._ev_time[-1]) + self._ev_note[-1]
+        self._warmup_sink = sink
+    
+    def _reset_led_frames(self) -> None:
+        """
+        OPTIMIZATION: (Re)allocate the previous/current LED frame buffers.
+        Called at init time and whenever the LED count may have changed.
+        """
+        frame_size = self.num_leds * 3
+        self._blank_frame = bytes(frame_size)
+        self._prev_frame = bytearray(frame_size)
+        self._curr_frame = bytearray(frame_size)
+        self._prev_lit: set = set()  # LED indices lit in _prev_frame
+        # OPTIMIZATION: Changed-LED dict reused across frames (clear() keeps its hash table allocated)
+        self._frame_led_data: Dict[int, tuple] = {}
+        self._led_frame_stale = False
+        self._last_highlight_key = None  # Inputs of the last learning-mode LED frame (None = must render)
+        self._last_frame_key = None  # Inputs of the last playback LED frame (None = must render)
+    
+    def _invalidate_led_frame(self) -> None:
+        """Force the next smart update to resend every lit LED, even if unchanged."""
+        self._led_frame_stale = True
+        self._last_highlight_key = None
+        self._last_frame_key = None
+    
+    def _turn_off_leds(self) -> None:
+        """Turn off the whole strip and mark the previous frame as blank."""
+        if self._led_controller:
+            with self._led_frame_lock, self._led_io_lock:
+                # Changes not yet written are superseded by the clear
+                with self._led_pending_lock:
+                    self._led_pending.clear()
+                self._led_controller.turn_off_all()
+                self._clear_led_frame_state()
+    
+    def _start_led_worker(self) -> None:
+        """Start the LED worker thread that renders frames published by the playback loop."""
+        self._led_frame_queue = queue.Queue(maxsize=1)
+        self._led_worker_thread = threading.Thread(target=self._led_worker, daemon=True)
+        self._led_worker_thread.start()
+        self._start_led_writer()
+    
+    def _stop_led_worker(self) -> None:
+        """Stop the LED worker with a sentinel and wait for its last frame to finish."""
+        if self._led_worker_thread is None:
+            return
+        self._publish_led_frame(None)
+        self._led_worker_thread.join(timeout=1.0)
+        self._led_worker_thread = None
+        self._stop_led_writer()
+    
+    def _start_led_writer(self) -> None:
+        """Start the writer thread that sends merged LED changes to the controller."""
+        with self._led_pending_lock:
+            self._led_pending = {}
+            self._led_writer_active = True
+        self._led_pending_event.clear()
+        self._led_writer_thread = threading.Thread(target=self._led_writer, daemon=True)
+        self._led_writer_thread.start()
+    
+    def _stop_led_writer(self) -> None:
+        """Stop the writer after it has flushed any pending changes; later writes go direct."""
+        if self._led_writer_thread is None:
+            return
+        with self._led_pending_lock:
+            self._led_writer_active = False
+        self._led_pending_event.set()
+        self._led_writer_thread.join(timeout=1.0)
+        self._led_writer_thread = None
+    
+    def _write_led_changes(self, changes: Dict[int, tuple]) -> None:
+        """
+        Send changed LEDs to the controller: merged into the writer's pending set while
+        the writer runs (never blocks on LED I/O), otherwise written directly.
+        
+        Args:
+            changes: LED index -> RGB color for LEDs that changed
+        """
+        with self._led_pending_lock:
+            if self._led_writer_active:
+                self._led_pending.update(changes)
+                self._led_pending_event.set()
+                return
+        with self._led_io_lock:
+            self._led_controller.set_multiple_leds(changes, auto_show=True)
+    
+    def _led_writer(self) -> None:
+        """LED writer thread: send the merged pending changes each time new ones arrive."""
+        # OPTIMIZATION: Two pending dicts are swapped back and forth instead of allocating one per write
+        spare: Dict[int, tuple] = {}
+        while True:
+            self._led_pending_event.wait()
+            with self._led_io_lock:
+                with self._led_pending_lock:
+                    self._led_pending_event.clear()
+                    changes = self._led_pending
+                    self._led_pending = spare
+                    active = self._led_writer_active
+                if changes:
+                    try:
+                        self._led_controller.set_multiple_leds(changes, auto_show=True)
+                    except Exception as e:
+                        logger.error(f"Error writing LED changes: {e}")
+                    changes.clear()
+                spare = changes
+            if not active:
+                break
+    
+    def _publish_led_frame(self, notes_mask: Optional[int]) -> None:
+        """
+        Hand the latest frame to the LED worker without blocking.
+        
+        If the worker is still busy with an older frame, that frame is dropped and
+        replaced, so slow LED backends coalesce frames instead of falling behind.
+        
+        Args:
+            notes_mask: Bitmask of notes to display, or None to stop the worker
+        """
+        frame_queue = self._led_frame_queue
+        try:
+            frame_queue.put_nowait(notes_mask)
+        except queue.Full:
+            try:
+                frame_queue.get_nowait()
+            except queue.Empty:
+                pass
+            try:
+                frame_queue.put_nowait(notes_mask)
+            except queue.Full:
+                pass
+    
+    def _led_worker(self) -> None:
+        """LED worker thread: render each published note mask until the stop sentinel."""
+        frame_queue = self._led_frame_queue
+        while True:
+            notes_mask = frame_queue.get()
+            if notes_mask is None:
+                break
+            self._update_leds(_mask_to_notes(notes_mask))
+    
+    def _clear_led_frame_state(self) -> None:
+        """Mark the previous frame as blank after the strip was cleared externally (turn_off_all)."""
+        self._prev_frame[:] = self._blank_frame
+        self._prev_lit = set()
+        self._led_frame_stale = False
+        self._last_highlight_key = None
+        self._last_frame_key = None
+    
     def _update_leds_smart(self, led_data: Dict[int, tuple]) -> None:
         """
         OPTIMIZATION: Smart LED update - only update changed LEDs instead of all.
         Reduces LED I/O by 60-70% by tracking state and only changing LEDs that differ.
         
+        The new frame is written into a flat RGB buffer and compared against the previous
+        one in a single memcmp; only when they differ are the candidate LEDs (lit now or
+        lit before) compared individually.
+        
         Args:
             led_data: Dictionary mapping LED index to RGB color tuple
         """
@@ -560,30 +1136,84 @@ class PlaybackService:
             return
         
         try:
-            # Find changes from last state
-            changes_only = {}
-            
-            # Check for updated colors
-            for led_idx in led_data:
-                if self._last_led_state.get(led_idx) != led_data[led_idx]:
-                    changes_only[led_idx] = led_data[led_idx]
-            
-            # Check for LEDs that should be turned off (were on, but not in new data)
-            for led_idx in self._last_led_state:
-                if led_idx not in led_data:
-                    changes_only[led_idx] = (0, 0, 0)  # Turn off
-            
-            # Only update if there are changes
-            if changes_only:
-                self._led_controller.set_multiple_leds(changes_only, auto_show=True)
-                logger.debug(f"Smart LED update: {len(changes_only)} of {len(self._last_led_state) + len(led_data)} LEDs changed")
-            
-            # Update state for next comparison
-            self._last_led_state = led_data.copy()
+            num_leds = self.num_leds
+            with self._led_frame_lock:
+                curr = self._curr_frame
+                curr[:] = self._blank_frame
+                
+                lit = set()
+                for led_idx, color in led_data.items():
+                    if 0 <= led_idx < num_leds:
+                        offset = led_idx * 3
+                        curr[offset:offset + 3] = color
+                        lit.add(led_idx)
+                
+                self._flush_led_frame(lit)
         
         except Exception as e:
             logger.error(f"Error in smart LED update: {e}")
     
+    def _render_note_colors(self, note_colors: Iterable[Tuple[int, bytes]]) -> None:
+        """
+        OPTIMIZATION: Render (note, RGB bytes) pairs straight into the LED frame buffer and
+        flush the diff, instead of building an LED-index dict for _update_leds_smart.
+        
+        Later pairs win where notes share LEDs, like later dict assignments did.
+        
+        Args:
+            note_colors: Iterable of (MIDI note, 3-byte RGB color)
+        """
+        note_to_leds = self._note_to_leds
+        note_led_runs = self._note_led_runs
+        with self._led_frame_lock:
+            curr = self._curr_frame
+            curr[:] = self._blank_frame
+            lit = set()
+            for note, color in note_colors:
+                if 0 <= note < 128:
+                    for start, end, count in note_led_runs[note]:
+                        curr[start:end] = color * count
+                    lit.update(note_to_leds[note])
+            
+            if lit or self._prev_lit:
+                self._flush_led_frame(lit)
+    
+    def _flush_led_frame(self, lit: set) -> None:
+        """
+        OPTIMIZATION: Diff the rendered current frame against the previous one and push changes.
+        
+        Callers render straight into _curr_frame (after blanking it) and pass the set of
+        LED indices they lit, so rendering and diffing share one frame buffer.
+        
+        Args:
+            lit: In-range LED indices written into _curr_frame for this frame
+        """
+        self._last_frame_key = None  # Strip no longer holds the last playback frame
+        curr = self._curr_frame
+        prev = self._prev_frame
+        stale = self._led_frame_stale
+        if not stale and curr == prev:
+            return
+        
+        # Find changes from last frame (LEDs lit now plus LEDs that were lit before)
+        changes_only = self._frame_led_data
+        changes_only.clear()
+        for led_idx in self._prev_lit.union(lit):
+            offset = led_idx * 3
+            pixel = curr[offset:offset + 3]
+            if stale or pixel != prev[offset:offset + 3]:
+                changes_only[led_idx] = tuple(pixel)
+        
+        # Only update if there are changes
+        if changes_only:
+            self._write_led_changes(changes_only)
+            logger.debug("Smart LED update: %d of %d LEDs changed", len(changes_only), self.num_leds)
+        
+        # Swap buffers: the current frame becomes the comparison base for the next update
+        self._prev_frame, self._curr_frame = curr, prev
+        self._prev_lit = lit
+        self._led_frame_stale = False
+    
     # ==================== END OPTIMIZATION METHODS ====================
     
     @property
@@ -656,8 +1286,59 @@ class PlaybackService:
             self._status_callbacks.remove(callback)
     
     def _notify_status_change(self):
-        """Notify all callbacks of status change"""
-        status = self.get_status()
+        """
+        Schedule a status notification for all callbacks.
+        
+        Never blocks: the notifier thread picks up the latest state, so changes made
+        in quick succession coalesce into a single callback round.
+        """
+        if not self._status_callbacks:
+            return
+        
+        if self._status_thread is None:
+            with self._status_thread_lock:
+                if self._status_thread is None:
+                    self._status_stop.clear()
+                    self._status_thread = threading.Thread(target=self._status_notifier, daemon=True)
+                    self._status_thread.start()
+        self._status_dirty.set()
+    
+    def _status_notifier(self):
+        """
+        Notifier thread: emit the latest status whenever it has been marked dirty.
+        
+        Runs until _status_stop is set; the wake-up that comes with the stop emits the
+        final status once on the way out.
+        """
+        stop = self._status_stop
+        dirty = self._status_dirty
+        while not stop.is_set():
+            dirty.wait()
+            dirty.clear()
+            self._emit_status()
+    
+    def _stop_status_notifier(self) -> None:
+        """Signal the notifier thread to stop and wait for it to finish."""
+        with self._status_thread_lock:
+            thread = self._status_thread
+            if thread is None:
+                return
+            self._status_stop.set()
+            self._status_dirty.set()
+            thread.join(timeout=1.0)
+            self._status_thread = None
+    
+    def _emit_status(self):
+        """Notify all callbacks of the current status"""
+        # OPTIMIZATION: Update the pooled status view in place instead of allocating per notification
+        status = self._status_view
+        status.state = self._state
+        status.current_time = self._current_time
+        status.total_duration = self._total_duration
+        status.filename = self._filename
+        status.progress_percentage = self._progress_percentage()
+        status.error_message = None if self._state != PlaybackState.ERROR else "Playback error occurred"
+        
         for callback in self._status_callbacks:
             try:
                 callback(status)
@@ -679,12 +1360,15 @@ class PlaybackService:
             
             # If playing, adjust start time to maintain sync
             if self._state == PlaybackState.PLAYING:
-                self._start_time = time.time() - self._current_time / self._tempo_multiplier
+                self._anchor_clock(time.monotonic_ns())
             
             # Clear active notes and update LEDs
-            self._active_notes.clear()
-            if self._led_controller:
-                self._led_controller.turn_off_all()
+            # OPTIMIZATION: Diff to a blank frame (only lit LEDs are sent) instead of
+            # turn_off_all() followed by a full redraw on the next frame
+            self._clear_active_notes()
+            self._clear_note_queues()  # Keep queued timestamps non-decreasing after a jump
+            self._reset_event_cursor()
+            self._update_leds(())
             
             logger.info(f"Seeked to {time_seconds:.2f}s")
             self._notify_status_change()
@@ -694,6 +1378,10 @@ class PlaybackService:
             logger.error(f"Failed to seek: {e}")
             return False
     
+    def _anchor_clock(self, now_ns: int) -> None:
+        """Set the playback start anchor so that now_ns corresponds to _current_time at the current tempo."""
+        self._start_ns = now_ns - int(self._current_time / self._tempo_multiplier * 1e9)
+    
     def set_tempo(self, multiplier: float) -> bool:
         """Set tempo multiplier (1.0 = normal, 0.5 = half speed, 2.0 = double speed)"""
         try:
@@ -702,9 +1390,9 @@ class PlaybackService:
             
             # If playing, adjust start time to maintain current position
             if self._state == PlaybackState.PLAYING:
-                current_real_time = time.time()
-                elapsed_playback_time = (current_real_time - self._start_time) * self._tempo_multiplier
-                self._start_time = current_real_time - elapsed_playback_time / multiplier
+                now_ns = time.monotonic_ns()
+                elapsed_playback_time = (now_ns - self._start_ns) * self._tempo_multiplier * 1e-9
+                self._start_ns = now_ns - int(elapsed_playback_time / multiplier * 1e9)
             
             self._tempo_multiplier = multiplier
             logger.info(f"Tempo set to {multiplier:.2f}x")
@@ -721,6 +1409,7 @@ class PlaybackService:
             # Clamp volume to valid range
             multiplier = max(0.0, min(multiplier, 1.0))
             self._volume_multiplier = multiplier
+            self._rebuild_note_color_lut()
             logger.info(f"Volume set to {multiplier:.2f}")
             self._notify_status_change()
             return True
@@ -783,7 +1472,8 @@ class PlaybackService:
                 logger.warning("No MIDI parser available, using demo notes")
                 self._note_events = self._generate_demo_notes()
             
-            self._total_duration = max(event.time + event.duration for event in self._note_events) if self._note_events else 0
+            self._rebuild_event_arrays()
+            self._total_duration = max(self._ev_end, default=0.0)
             
             # OPTIMIZATION: Re-build caches after loading new MIDI file (Phase 2A)
             self._prebuild_note_to_leds_cache()
@@ -809,6 +1499,7 @@ class PlaybackService:
         # Generate a simple scale pattern
         scale_notes = [60, 62, 64, 65, 67, 69, 71, 72]  # C major scale
         
+        # OPTIMIZATION: Emitted in time order by construction, so no sort is needed
         for i, note in enumerate(scale_notes):
             # Each note plays for 0.5 seconds, starting every 0.6 seconds
             notes.append(NoteEvent(
@@ -817,17 +1508,18 @@ class PlaybackService:
                 velocity=80,
                 duration=0.5
             ))
-        
-        # Add some harmony
-        for i in range(4):
-            notes.append(NoteEvent(
-                time=i * 1.2 + 0.3,
-                note=scale_notes[i] + 12,  # Octave higher
-                velocity=60,
-                duration=0.8
-            ))
-        
-        return sorted(notes, key=lambda x: x.time)
+            
+            # Add some harmony: first four scale notes an octave higher, every 1.2 seconds
+            # (offset 0.3s, so each lands between two scale notes)
+            if i % 2 == 0 and i // 2 < 4:
+                notes.append(NoteEvent(
+                    time=(i // 2) * 1.2 + 0.3,
+                    note=scale_notes[i // 2] + 12,  # Octave higher
+                    velocity=60,
+                    duration=0.8
+                ))
+        
+        return notes
     
     def _convert_parsed_notes(self, parsed_data: Dict[str, Any]) -> List[NoteEvent]:
         """
@@ -846,45 +1538,70 @@ class PlaybackService:
             # The MIDI parser returns structure: {'events': [{'time': int, 'note': int, 'velocity': int, 'type': str, 'led_index': int}]}
             if 'events' in parsed_data:
                 # Group note_on and note_off events to calculate durations
-                active_notes = {}  # note -> (start_time, velocity)
+                # OPTIMIZATION: Each note reserves its slot in `notes` at note_on, so notes come out
+                # in start order (MIDI events are time-sorted) and usually need no sort afterwards
+                active_notes = {}  # note -> (start_time, velocity, slot index in notes)
+                max_time_ms = 0  # Latest event time, for notes that never get a note_off
                 
                 for event_data in parsed_data['events']:
                     note_num = event_data.get('note', 60)
                     time_ms = event_data.get('time', 0)
+                    if time_ms > max_time_ms:
+                        max_time_ms = time_ms
                     time_sec = time_ms / 1000.0  # Convert milliseconds to seconds
                     velocity = event_data.get('velocity', 80)
                     event_type = event_data.get('type', 'on')
                     
                     if event_type == 'on' and velocity > 0:
+                        # Overlapping note_on for a note that is still sounding: duplicate starts
+                        # are ignored, a later re-trigger ends the pending note here (synthetic note_off)
+                        if note_num in active_notes:
+                            start_time, note_velocity, slot = active_notes[note_num]
+                            if time_sec <= start_time:
+                                continue
+                            notes[slot] = NoteEvent(
+                                time=start_time,
+                                note=note_num,
+                                velocity=note_velocity,
+                                duration=max(0.1, time_sec - start_time),  # Minimum duration of 0.1s
+                                channel=0
+                            )
+                        
                         # Note starts
-                        active_notes[note_num] = (time_sec, velocity)
+                        active_notes[note_num] = (time_sec, velocity, len(notes))
+                        notes.append(None)
                     elif event_type == 'off' or (event_type == 'on' and velocity == 0):
                         # Note ends
                         if note_num in active_notes:
-                            start_time, note_velocity = active_notes[note_num]
+                            start_time, note_velocity, slot = active_notes[note_num]
                             duration = max(0.1, time_sec - start_time)  # Minimum duration of 0.1s
                             
-                            notes.append(NoteEvent(
+                            notes[slot] = NoteEvent(
                                 time=start_time,
                                 note=note_num,
                                 velocity=note_velocity,
                                 duration=duration,
                                 channel=0
-                            ))
+                            )
                             
                             del active_notes[note_num]
                 
                 # Handle any remaining active notes (notes that never got a note_off)
-                max_time = max([event['time'] / 1000.0 for event in parsed_data['events']], default=0)
-                for note_num, (start_time, velocity) in active_notes.items():
+                # OPTIMIZATION: max_time tracked in the loop above instead of a second pass over all events
+                max_time = max_time_ms / 1000.0
+                for note_num, (start_time, velocity, slot) in active_notes.items():
                     duration = max(0.5, max_time - start_time)  # Default duration
-                    notes.append(NoteEvent(
+                    notes[slot] = NoteEvent(
                         time=start_time,
                         note=note_num,
                         velocity=velocity,
                         duration=duration,
                         channel=0
-                    ))
+                    )
+                
+                # Only sort when the source events were out of order (stable, keeps same-time order)
+                if any(notes[i].time > notes[i + 1].time for i in range(len(notes) - 1)):
+                    notes.sort(key=lambda x: x.time)
             
             logger.info(f"Converted {len(notes)} notes from parsed MIDI data")
             
@@ -893,7 +1610,7 @@ class PlaybackService:
             # Fall back to demo notes on error
             notes = self._generate_demo_notes()
         
-        return sorted(notes, key=lambda x: x.time)
+        return notes
     
     def start_playback(self) -> bool:
         """
@@ -917,21 +1634,24 @@ class PlaybackService:
             
             # Load and reset learning mode
             self._load_learning_mode_settings()
-            self._note_queue.clear()  # PHASE C: unified queue
-            self._last_queue_cleanup = time.time()
+            self._clear_note_queues()  # PHASE C: played-note queues
+            self._reset_event_cursor()
+            self._last_queue_cleanup = time.monotonic()
+            self._warmup_caches()
             
             # Start performance monitoring
             if self.performance_monitor:
                 self.performance_monitor.reset_metrics()
                 self.performance_monitor.start_monitoring()
             
+            # Anchor the clock before the thread starts so its first tick sees a valid start time
+            self._state = PlaybackState.PLAYING
+            self._anchor_clock(time.monotonic_ns())  # Account for resume and tempo
+            
             # Start playback thread
             self._playback_thread = threading.Thread(target=self._playback_loop, daemon=True)
             self._playback_thread.start()
             
-            self._state = PlaybackState.PLAYING
-            self._start_time = time.time() - self._current_time / self._tempo_multiplier  # Account for resume and tempo
-            
             logger.info("Playback started")
             self._notify_status_change()
             return True
@@ -953,14 +1673,13 @@ class PlaybackService:
             if self._state == PlaybackState.PLAYING:
                 self._pause_event.set()
                 self._state = PlaybackState.PAUSED
-                self._pause_time = time.time()
+                self._pause_ns = time.monotonic_ns()
                 logger.info("Playback paused")
             elif self._state == PlaybackState.PAUSED:
                 self._pause_event.clear()
                 self._state = PlaybackState.PLAYING
                 # Adjust start time to account for pause duration
-                pause_duration = time.time() - self._pause_time
-                self._start_time += pause_duration
+                self._start_ns += time.monotonic_ns() - self._pause_ns
                 logger.info("Playback resumed")
             else:
                 logger.warning(f"Cannot pause/resume from state: {self._state}")
@@ -993,18 +1712,23 @@ class PlaybackService:
                 self.performance_monitor.stop_monitoring()
             
             # Turn off all LEDs
-            if self._led_controller:
-                self._led_controller.turn_off_all()
+            self._turn_off_leds()
             
-            # Send MIDI note_off for all active notes
+            # Send MIDI note_off for all notes still on at the output
             if self._midi_output_enabled and self._midi_output_service:
-                for note in list(self._active_notes.keys()):
-                    self._send_midi_note_off(note)
+                pending_midi = []
+                mask = self._midi_on_mask
+                while mask:
+                    low_bit = mask & -mask
+                    pending_midi.append(('note_off', low_bit.bit_length() - 1, 0))
+                    mask ^= low_bit
+                if pending_midi:
+                    self._send_midi_batch(pending_midi)
             
             self._state = PlaybackState.STOPPED
             self._current_time = 0.0
-            self._active_notes.clear()
-            self._midi_notes_sent.clear()
+            self._clear_active_notes()
+            self._midi_on_mask = 0
             
             logger.info("Playback stopped")
             self._notify_status_change()
@@ -1018,25 +1742,40 @@ class PlaybackService:
         """Main playback loop running in separate thread"""
         try:
             logger.info("Playback loop started")
-            last_status_update = 0
-            last_led_update = 0
+            last_status_update_ns = 0
+            last_led_update_ns = 0
             
             # Reload learning mode settings at start of playback
             if self._learning_config.enabled:
                 self._load_learning_mode_settings()
             
-            while not self._stop_event.is_set():
-                current_loop_time = time.time()
+            # OPTIMIZATION: Hoist loop-invariant attribute and method lookups into locals
+            stop_is_set = self._stop_event.is_set
+            stop_wait = self._stop_event.wait
+            pause_is_set = self._pause_event.is_set
+            monotonic_ns = time.monotonic_ns
+            perf_counter = time.perf_counter
+            learning_config = self._learning_config
+            process_note_events = self._process_note_events
+            publish_led_frame = self._publish_led_frame
+            perf = self.performance_monitor
+            
+            # LED frames are rendered off this thread; the loop only publishes note masks
+            self._start_led_worker()
+            
+            while not stop_is_set():
+                now_ns = monotonic_ns()
                 
                 # Handle pause
-                if self._pause_event.is_set():
-                    time.sleep(0.05)  # Reduced pause check interval
+                if pause_is_set():
+                    if stop_wait(0.05):  # Reduced pause check interval; wakes immediately on stop
+                        break
                     continue
                 
                 # Handle learning mode pause
                 # OPTIMIZATION: Check frequency reduced from 50Hz to 10Hz (Phase 2B)
                 # User won't notice 100ms latency, but CPU is reduced by 80%
-                if self._learning_config.enabled:
+                if learning_config.enabled:
                     # Re-check pause status only at reduced frequency (every 100ms)
                     if (self._current_time - self._last_learning_mode_check) > self._learning_mode_check_interval:
                         self._is_learning_mode_paused = self._check_learning_mode_pause()
@@ -1044,102 +1783,171 @@ class PlaybackService:
                     
                     # If paused (from any check, recent or not), stay paused
                     if self._is_learning_mode_paused:
-                        # Update LEDs even while paused (shows expected notes and flash countdown)
-                        self._update_leds()
-                        time.sleep(0.05)  # Brief sleep before checking again
+                        # Update LEDs even while paused, unless the learning-mode highlight (expected
+                        # notes and flash countdown) owns the strip; it re-renders itself on each check
+                        if self._last_highlight_key is None:
+                            publish_led_frame(self._active_mask)
+                        if stop_wait(0.05):  # Brief sleep before checking again; wakes immediately on stop
+                            break
                         continue
                 
                 # Update current time with tempo adjustment
-                self._current_time = (current_loop_time - self._start_time) * self._tempo_multiplier
+                current_time = (now_ns - self._start_ns) * self._tempo_multiplier * 1e-9
+                self._current_time = current_time
                 
                 # Handle loop functionality
-                if self._loop_enabled and self._current_time >= self._loop_end:
-                    logger.info(f"Loop: jumping from {self._current_time:.2f}s to {self._loop_start:.2f}s")
+                if self._loop_enabled and current_time >= self._loop_end:
+                    logger.info(f"Loop: jumping from {current_time:.2f}s to {self._loop_start:.2f}s")
                     self._current_time = self._loop_start
-                    self._start_time = current_loop_time - self._current_time / self._tempo_multiplier
-                    self._active_notes.clear()
-                    if self._led_controller:
-                        self._led_controller.turn_off_all()
+                    self._anchor_clock(now_ns)
+                    self._clear_active_notes()
+                    self._clear_note_queues()  # Keep queued timestamps non-decreasing after a jump
+                    self._reset_event_cursor()
+                    last_led_update_ns = 0  # Publish the post-jump frame this tick; the diff clears old notes
                 
                 # Check if playback is complete (only if not looping)
-                elif self._current_time >= self._total_duration:
+                elif current_time >= self._total_duration:
                     logger.info("Playback completed")
                     break
                 
                 # Process note events
-                note_processing_start = time.time()
-                self._process_note_events()
-                
-                # Track note processing performance
-                if self.performance_monitor:
-                    note_processing_time = time.time() - note_processing_start
-                    self.performance_monitor.record_note_processing_time(note_processing_time)
+                if perf:
+                    note_processing_start = perf_counter()
+                    process_note_events()
+                    # Track note processing performance
+                    perf.record_note_processing_time(perf_counter() - note_processing_start)
+                else:
+                    process_note_events()
                 
                 # Update LED display (limit to 60 FPS max)
-                if current_loop_time - last_led_update >= 0.0167:  # ~60 FPS
-                    self._update_leds()
+                if now_ns - last_led_update_ns >= 16_700_000:  # ~60 FPS
+                    publish_led_frame(self._active_mask)  # Never blocks on the LED backend
                     
                     # Track LED update
-                    if self.performance_monitor:
-                        self.performance_monitor.record_led_update()
+                    if perf:
+                        perf.record_led_update()
                     
-                    last_led_update = current_loop_time
+                    last_led_update_ns = now_ns
                 
                 # Notify status update (limit to 4 Hz)
-                if current_loop_time - last_status_update >= 0.25:  # Every 0.25 seconds
+                if now_ns - last_status_update_ns >= 250_000_000:  # Every 0.25 seconds
                     self._notify_status_change()
-                    last_status_update = current_loop_time
+                    last_status_update_ns = now_ns
                 
-                # Sleep for timing precision (reduced for better responsiveness)
-                time.sleep(0.005)  # 5ms resolution
+                # OPTIMIZATION: Sleep until the next thing is actually due (next note on/off, next
+                # LED frame or status update) instead of waking every 5ms; capped at one LED frame.
+                # Waiting on the stop event lets stop_playback() interrupt the sleep immediately.
+                sleep_for = min(
+                    (last_led_update_ns + 16_700_000 - now_ns) * 1e-9,
+                    (last_status_update_ns + 250_000_000 - now_ns) * 1e-9,
+                )
+                tempo = self._tempo_multiplier
+                current_time = self._current_time
+                next_idx = self._next_event_idx
+                if next_idx < len(self._ev_time):
+                    sleep_for = min(sleep_for, (self._ev_time[next_idx] - 0.02 - current_time) / tempo)
+                if self._active_mask:
+                    sleep_for = min(sleep_for, (self._next_note_end - current_time) / tempo)
+                if stop_wait(max(0.0, sleep_for)):
+                    break
+            
+            # Let the LED worker finish its last frame before the strip is cleared
+            self._stop_led_worker()
             
             # Playback finished
             if not self._stop_event.is_set():
                 # Natural completion
                 self._state = PlaybackState.STOPPED
                 self._current_time = self._total_duration
-                if self._led_controller:
-                    self._led_controller.turn_off_all()
+                self._turn_off_leds()
                 self._notify_status_change()
             
         except Exception as e:
             logger.error(f"Error in playback loop: {e}")
             self._state = PlaybackState.ERROR
             self._notify_status_change()
+        finally:
+            self._stop_led_worker()
+    
+    def _clear_active_notes(self) -> None:
+        """Forget all sounding notes (end times are only read while a note's bit is set)."""
+        self._active_mask = 0
+        self._next_note_end = math.inf
     
     def _process_note_events(self):
         """Process note events at current time, including MIDI output"""
         current_time = self._current_time
+        active_mask = self._active_mask
+        active_end = self._active_end
+        debug = logger.isEnabledFor(logging.DEBUG)
         
-        # Find notes that should start now
-        for event in self._note_events:
-            if abs(event.time - current_time) < 0.02:  # 20ms tolerance
-                if event.note not in self._active_notes:
-                    self._active_notes[event.note] = current_time + event.duration
-                    self._midi_notes_sent[event.note] = False  # Mark as not yet sent to MIDI output
-                    
-                    # Send MIDI output if enabled
-                    if self._midi_output_enabled and self._midi_output_service:
-                        self._send_midi_note_on(event.note, event.velocity)
-                    
-                    logger.debug(f"Note ON: {event.note} at {current_time:.2f}s")
+        # OPTIMIZATION: Collect MIDI messages for this tick and flush them in one batch
+        midi_out = self._midi_output_enabled and self._midi_output_service is not None
+        pending_midi = []
+        # OPTIMIZATION: Loop-invariant attributes bound to locals; the MIDI mask is written back once
+        midi_on_mask = self._midi_on_mask
+        ev_note = self._ev_note
         
-        # Remove notes that should end
-        notes_to_remove = []
-        for note, end_time in self._active_notes.items():
-            if current_time >= end_time:
-                notes_to_remove.append(note)
-                
-                # Send MIDI note_off if enabled
-                if self._midi_output_enabled and self._midi_output_service:
-                    self._send_midi_note_off(note)
-                
-                logger.debug(f"Note OFF: {note} at {current_time:.2f}s")
-        
-        for note in notes_to_remove:
-            del self._active_notes[note]
-            if note in self._midi_notes_sent:
-                del self._midi_notes_sent[note]
+        # Find notes that should start now
+        # OPTIMIZATION: Events are sorted by time, so advance a cursor over the ones now due
+        # instead of scanning every event each tick; both bounds come from C-level bisects
+        first, due_end = _due_event_range(self._ev_time, self._next_event_idx, current_time)
+        self._next_event_idx = due_end
+        if first != due_end:
+            ev_duration = self._ev_duration
+            ev_velocity = self._ev_velocity
+            adjust_velocity = self._adjust_velocity
+        for i in range(first, due_end):
+            note = ev_note[i]
+            bit = 1 << note
+            if active_mask & bit:
+                # Same pitch still sounding (a back-to-back repeat): the cursor moves past this
+                # event, so end the old instance here instead of skipping the new note_on
+                if midi_out and midi_on_mask & bit:
+                    pending_midi.append(('note_off', note, 0))
+                if debug:
+                    logger.debug("Note OFF: %d at %.2fs (re-triggered)", note, current_time)
+            active_mask |= bit
+            active_end[note] = current_time + ev_duration[i]
+
+            # Queue MIDI output if enabled (bit marks the note as sent to MIDI output)
+            if midi_out:
+                pending_midi.append(('note_on', note, adjust_velocity(ev_velocity[i])))
+                midi_on_mask |= bit
+            else:
+                midi_on_mask &= ~bit
+
+            if debug:
+                logger.debug("Note ON: %d at %.2fs", note, current_time)
+        
+        # Remove notes that should end, tracking the earliest end among those still sounding
+        next_note_end = math.inf
+        mask = active_mask
+        while mask:
+            bit = mask & -mask
+            mask ^= bit
+            note = bit.bit_length() - 1
+            end_time = active_end[note]
+            if current_time < end_time:
+                if end_time < next_note_end:
+                    next_note_end = end_time
+                continue
+            active_mask ^= bit
+            
+            # Queue MIDI note_off if enabled and the note_on was sent
+            if midi_out and midi_on_mask & bit:
+                pending_midi.append(('note_off', note, 0))
+            midi_on_mask &= ~bit
+            
+            if debug:
+                logger.debug("Note OFF: %d at %.2fs", note, current_time)
+        
+        self._active_mask = active_mask
+        self._next_note_end = next_note_end
+        self._midi_on_mask = midi_on_mask
+        
+        if pending_midi:
+            self._send_midi_batch(pending_midi)
     
     def _cleanup_old_queued_notes(self) -> None:
         """
@@ -1151,45 +1959,44 @@ class PlaybackService:
         
         Notes older than _queue_max_age_seconds are removed.
         """
-        current_time = time.time()
-        if current_time - self._last_queue_cleanup < self._queue_cleanup_interval:
+        # Monotonic clock: immune to NTP steps and manual wall-clock changes
+        now = time.monotonic()
+        if now - self._last_queue_cleanup < self._queue_cleanup_interval:
             return  # Not time for cleanup yet
         
-        self._last_queue_cleanup = current_time
+        self._last_queue_cleanup = now
         
         # Calculate cutoff time: keep notes from last N seconds
         cutoff_time = self._current_time - self._learning_config.queue_max_age
         
-        # Filter out old notes from unified queue (PHASE C)
-        old_count = len(self._note_queue)
-        self._note_queue = deque(
-            (qn for qn in self._note_queue if qn.timestamp >= cutoff_time),
-            maxlen=5000
-        )
-        removed = old_count - len(self._note_queue)
+        # Filter out old notes from the per-hand queues (PHASE C)
+        # OPTIMIZATION: Timestamps are sorted, so stale notes form a prefix found by
+        # binary search; dropping it only advances the queue head (survivors are not copied)
+        removed = sum(hand_queue.drop_before(cutoff_time) for hand_queue in self._hand_queues)
         
         if removed > 0:
-            logger.debug(f"Queue cleanup at {self._current_time:.2f}s: "
-                        f"removed {removed} notes (older than {self._learning_config.queue_max_age}s)")
+            logger.debug("Queue cleanup at %.2fs: removed %d notes (older than %ss)",
+                         self._current_time, removed, self._learning_config.queue_max_age)
+    
+    def _queued_note_count(self) -> int:
+        """Total notes queued across both hands."""
+        return sum(len(hand_queue) for hand_queue in self._hand_queues)
+    
+    def _clear_note_queues(self) -> None:
+        """Empty both hand queues."""
+        for hand_queue in self._hand_queues:
+            hand_queue.clear()
     
     def _get_queued_notes_in_window(self, start: float, end: float) -> tuple:
         """
-        Extract notes from unified queue that fall within a timing window (PHASE C).
+        Extract notes from the per-hand queues that fall within a timing window (PHASE C).
         
         Returns:
             tuple: (played_left_notes, played_right_notes) - lists of note numbers
         """
-        played_left_notes = []
-        played_right_notes = []
-        
-        for queued_note in self._note_queue:
-            if start <= queued_note.timestamp <= end:
-                if queued_note.hand == 'left':
-                    played_left_notes.append(queued_note.note)
-                elif queued_note.hand == 'right':
-                    played_right_notes.append(queued_note.note)
-        
-        return played_left_notes, played_right_notes
+        # OPTIMIZATION: Binary search + slice per hand instead of scanning the whole queue
+        left_queue, right_queue = self._hand_queues
+        return left_queue.window(start, end), right_queue.window(start, end)
     
     def record_midi_note_played(self, note: int, hand: str) -> None:
         """
@@ -1204,19 +2011,27 @@ class PlaybackService:
         """
         # Only record if learning mode is enabled
         if not self._learning_config.enabled:
-            logger.debug(f"Ignoring note {note} - learning mode not enabled")
+            logger.debug("Ignoring note %d - learning mode not enabled", note)
             return
         
         # CRITICAL: Use playback time, NOT wall clock time!
         # This must match self._current_time used in _check_learning_mode_pause()
         playback_time = self._current_time
         
-        logger.info(f"🎵 RECORDING NOTE: {note} ({hand} hand) at playback time {playback_time:.3f}s (enabled={self._learning_config.enabled})")
+        # Append to the played hand's queue (PHASE C)
+        if hand == 'left':
+            hand_queue = self._hand_queues[0]
+        elif hand == 'right':
+            hand_queue = self._hand_queues[1]
+        else:
+            logger.debug("Ignoring note %d - unknown hand %r", note, hand)
+            return
+        hand_queue.append(note, playback_time)
         
-        # Append QueuedNote to unified queue (PHASE C)
-        queued_note = QueuedNote(note=note, hand=hand, timestamp=playback_time)
-        self._note_queue.append(queued_note)
-        logger.info(f"   └─ Queue now has {len(self._note_queue)} notes: {[(qn.note, f'{qn.timestamp:.2f}s') for qn in list(self._note_queue)[-3:]]}")
+        # Runs on every MIDI input: debug level, and the queue summary is only built when enabled
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug(f"Recorded note {note} ({hand} hand) at playback time {playback_time:.3f}s; "
+                         f"queue now has {len(hand_queue)} notes: {[(qn, f'{ts:.2f}s') for qn, ts in hand_queue.latest(3)]}")
     
     def _check_learning_mode_pause(self) -> bool:
         """
@@ -1245,12 +2060,12 @@ class PlaybackService:
         self._cleanup_old_queued_notes()
         
         # If neither hand requires notes, don't pause
-        if not self._learning_config.wait_for_left and not self._learning_config.wait_for_right:
+        if not self._waiting_hands:
             return False
         
         # Get the current timing window
         # Look at notes that are CURRENTLY ACTIVE (already started, not yet ended)
-        timing_window_seconds = self._learning_config.timing_window_ms / 1000.0
+        timing_window_seconds = self._timing_window_seconds
         
         # Find expected notes that are currently playing or about to play
         # Include notes that started up to 1 second ago (for overlap/legato)
@@ -1260,70 +2075,59 @@ class PlaybackService:
         
         # OPTIMIZATION: Use fast lookup (Phase 2A) instead of O(n) iteration
         # This replaces the loop that checked all events
-        if self._expected_notes_by_window:
+        # OPTIMIZATION: Note sets are handled as 128-bit masks (bit n => MIDI note n), so the
+        # subset / difference checks below are single integer operations
+        if self._expected_mask_bins:
             # Use pre-computed expected notes lookup
-            expected_left_notes, expected_right_notes = self._get_expected_notes_fast(window_start, window_end)
+            expected_left_mask, expected_right_mask = self._get_expected_masks_fast(window_start, window_end)
         else:
-            # Fallback to slow path if caches not ready
-            expected_left_notes = set()
-            expected_right_notes = set()
-            
-            for event in self._note_events:
-                # Include notes that START within our window
-                # (They may have already started or be about to start)
-                if window_start <= event.time < window_end:
-                    if event.note < 60:  # Left hand (below Middle C)
-                        expected_left_notes.add(event.note)
-                    else:  # Right hand (Middle C and above)
-                        expected_right_notes.add(event.note)
+            # Fallback if the bin masks are not ready: exact window over the sorted event columns
+            expected_left_mask, expected_right_mask = self._get_expected_masks_exact(window_start, window_end)
+        expected_left_notes = _mask_to_notes(expected_left_mask)
+        expected_right_notes = _mask_to_notes(expected_right_mask)
         
         # Detect window changes to reset flash state
         # When we move to a new set of expected notes, reset the flash trigger flag
-        current_expected = expected_left_notes | expected_right_notes
-        if current_expected != self._last_expected_notes:
+        current_expected_mask = expected_left_mask | expected_right_mask
+        if current_expected_mask != self._last_expected_mask:
             self._wrong_flash_triggered_this_window = False
-            self._last_expected_notes = current_expected
-            # CRITICAL FIX: Clear LED state when expected notes change to force refresh
+            self._last_expected_mask = current_expected_mask
+            # CRITICAL FIX: Invalidate LED frame when expected notes change to force refresh
             # This prevents smart batching from skipping updates when note mappings appear identical
-            self._last_led_state = {}
+            self._invalidate_led_frame()
         
-        # Extract notes from unified queue using timing window (PHASE C - single method call)
+        # Extract notes from the hand queues using timing window (PHASE C - single method call)
         # Use the SAME timing window for acceptance as for expected notes
         # This eliminates the "dead zone" where notes are expected but not accepted
         acceptance_start = window_start
         acceptance_end = window_end
         played_left_notes, played_right_notes = self._get_queued_notes_in_window(acceptance_start, acceptance_end)
         
-        # Debug: Show current state every ~500ms (not every frame!)
-        if int(self._current_time * 2) != int((self._current_time - 0.01) * 2):  # Every ~500ms
+        # Debug: Show current state every 10th check (~500ms at 20 Hz), not every frame!
+        # OPTIMIZATION: Counter instead of float boundary math; formatting skipped when INFO is off
+        self._lm_log_counter = (self._lm_log_counter + 1) % 10
+        if self._lm_log_counter == 0 and logger.isEnabledFor(logging.INFO):
             logger.info(f"📊 Learning mode check at {self._current_time:.2f}s:"
                        f" Expected L:{sorted(expected_left_notes)} R:{sorted(expected_right_notes)} |"
                        f" Played L:{played_left_notes} R:{played_right_notes} |"
-                       f" Queue:{len(self._note_queue)}")
-        
-        # Convert played note lists to sets for comparison (deduplicates for subset check)
-        played_left_set = set(played_left_notes)
-        played_right_set = set(played_right_notes)
+                       f" Queue:{self._queued_note_count()}")
         
-        # Check if all expected notes have been played
-        left_satisfied = True
-        right_satisfied = True
+        # Convert played note lists to masks for comparison (deduplicates for subset check)
+        played_left_mask = _note_mask(played_left_notes)
+        played_right_mask = _note_mask(played_right_notes)
         
-        if self._learning_config.wait_for_left and expected_left_notes:
-            left_satisfied = expected_left_notes.issubset(played_left_set)
-        
-        if self._learning_config.wait_for_right and expected_right_notes:
-            right_satisfied = expected_right_notes.issubset(played_right_set)
+        # Per-hand views (0 = left, 1 = right) so the checks below are written once for both hands
+        expected_by_hand = (expected_left_mask, expected_right_mask)
+        played_by_hand = (played_left_mask, played_right_mask)
         
         # CRITICAL: Check for WRONG notes first - these take priority over satisfaction!
         # If user plays any wrong notes, we must PAUSE and force them to correct before continuing
-        wrong_left_notes = played_left_set - expected_left_notes
-        wrong_right_notes = played_right_set - expected_right_notes
+        wrong_mask = (played_left_mask & ~expected_left_mask) | (played_right_mask & ~expected_right_mask)
         
-        has_expected_notes = expected_left_notes or expected_right_notes
+        has_expected_notes = current_expected_mask != 0
         
-        if wrong_left_notes or wrong_right_notes:
-            all_wrong = wrong_left_notes | wrong_right_notes
+        if wrong_mask:
+            all_wrong = _mask_to_notes(wrong_mask)
             logger.warning(f"❌ Wrong notes played: {sorted(all_wrong)}")
             
             # PHASE A: Create display state and render unified
@@ -1345,19 +2149,21 @@ class PlaybackService:
                 self._last_wrong_flash_time = self._current_time
                 self._wrong_flash_triggered_this_window = True
             
-            logger.debug(f"Learning mode PAUSING - user played wrong notes, must correct before proceeding")
+            logger.debug("Learning mode PAUSING - user played wrong notes, must correct before proceeding")
             # RETURN TRUE HERE: Pause playback until wrong notes are corrected
             # Do NOT clear queue - we need to keep the wrong notes for visual feedback
             # Do NOT proceed to satisfaction check - wrong notes take absolute priority
             return True
         
         # Only if NO wrong notes: check if all required notes are satisfied
-        all_satisfied = left_satisfied and right_satisfied
+        # (hands that don't wait, or have nothing expected, are trivially satisfied)
+        all_satisfied = all(not expected_by_hand[hand] & ~played_by_hand[hand] for hand in self._waiting_hands)
         
         # If all required notes are satisfied: clear them and proceed
         if all_satisfied and has_expected_notes:
-            logger.info(f"Learning mode: ✓ All required notes satisfied at {self._current_time:.2f}s. "
-                       f"Left: {sorted(expected_left_notes)}, Right: {sorted(expected_right_notes)}")
+            if logger.isEnabledFor(logging.INFO):
+                logger.info(f"Learning mode: ✓ All required notes satisfied at {self._current_time:.2f}s. "
+                           f"Left: {sorted(expected_left_notes)}, Right: {sorted(expected_right_notes)}")
             
             # Show satisfied notes on LEDs briefly (bright colors) - PHASE A: unified render
             state = LearningDisplayState(
@@ -1372,20 +2178,13 @@ class PlaybackService:
             )
             self._render_learning_mode_leds(state)
             
-            # CLEAR PRESSED KEYS: Remove notes from unified queue that are now satisfied (PHASE C)
+            # CLEAR PRESSED KEYS: Remove notes from the hand queues that are now satisfied (PHASE C)
             # This prevents them from carrying over to the next measure
-            notes_to_clear = expected_left_notes | expected_right_notes
-            
-            # Remove cleared notes from unified queue
-            old_queue_len = len(self._note_queue)
-            self._note_queue = deque(
-                qn for qn in self._note_queue
-                if qn.note not in notes_to_clear
-            )
+            # Remove cleared notes from both hand queues in place
+            removed = sum(hand_queue.discard_notes(current_expected_mask) for hand_queue in self._hand_queues)
             
-            logger.info(f"Learning mode: Cleared satisfied notes from queue. "
-                       f"Removed: {old_queue_len - len(self._note_queue)}, "
-                       f"Remaining: {len(self._note_queue)}")
+            logger.info("Learning mode: Cleared satisfied notes from queue. Removed: %d, Remaining: %d",
+                        removed, self._queued_note_count())
             
             # PROCEED TO PLAYBACK: Return False to allow playback to continue
             # This will advance the playback time to the next note
@@ -1393,11 +2192,11 @@ class PlaybackService:
         
         # If there are no expected notes at all, don't pause (let playback continue)
         if not has_expected_notes:
-            logger.debug(f"No expected notes at {self._current_time:.2f}s, continuing playback")
+            logger.debug("No expected notes at %.2fs, continuing playback", self._current_time)
             return False
         
         # Not all required notes satisfied yet - show guidance and pause
-        logger.debug(f"Learning mode PAUSING - waiting for all required notes")
+        logger.debug("Learning mode PAUSING - waiting for all required notes")
         
         # Visualize expected notes on LEDs to show user what's needed - PHASE A: unified render
         state = LearningDisplayState(
@@ -1415,38 +2214,36 @@ class PlaybackService:
         # Return True: Pause playback until all notes are played correctly
         return True
     
-    def _send_midi_note_on(self, note: int, velocity: int) -> None:
-        """
-        Send MIDI note_on with velocity adjustment for volume multiplier.
-        
-        Args:
-            note: MIDI note number
-            velocity: Original velocity from MIDI file
-        """
-        try:
-            # Apply volume multiplier to velocity
-            adjusted_velocity = max(1, int(velocity * self._volume_multiplier))
-            adjusted_velocity = min(127, adjusted_velocity)
-            
-            self._midi_output_service.send_note_on(note, adjusted_velocity, channel=0)
-            self._midi_notes_sent[note] = True
-            logger.debug(f"Sent MIDI note_on: note={note}, velocity={adjusted_velocity}")
-        except Exception as e:
-            logger.error(f"Error sending MIDI note_on: {e}")
+    def _adjust_velocity(self, velocity: int) -> int:
+        """Apply the volume multiplier to a MIDI velocity, clamped to 1-127."""
+        return min(127, max(1, int(velocity * self._volume_multiplier)))
     
-    def _send_midi_note_off(self, note: int) -> None:
+    def _send_midi_batch(self, messages: List[tuple]) -> None:
         """
-        Send MIDI note_off message.
+        Send queued MIDI messages to the output service in one call.
+        
+        Uses the service's send_batch() when available (one port lock for the whole
+        batch); otherwise falls back to individual send_note_on/send_note_off calls
+        inside a single try block.
         
         Args:
-            note: MIDI note number
+            messages: ('note_on', note, velocity) / ('note_off', note, 0) tuples
         """
+        service = self._midi_output_service
         try:
-            if self._midi_notes_sent.get(note, False):
-                self._midi_output_service.send_note_off(note, channel=0)
-                logger.debug(f"Sent MIDI note_off: note={note}")
+            send_batch = getattr(service, 'send_batch', None)
+            if callable(send_batch):
+                send_batch(messages, channel=0)
+            else:
+                for kind, note, velocity in messages:
+                    if kind == 'note_on':
+                        service.send_note_on(note, velocity, channel=0)
+                    else:
+                        service.send_note_off(note, channel=0)
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug(f"Sent {len(messages)} MIDI messages: {messages}")
         except Exception as e:
-            logger.error(f"Error sending MIDI note_off: {e}")
+            logger.error(f"Error sending MIDI messages: {e}")
     
     def _render_learning_mode_leds(self, state: LearningDisplayState) -> None:
         """
@@ -1463,51 +2260,61 @@ class PlaybackService:
             return
         
         try:
-            led_data = {}
+            # OPTIMIZATION: Skip the render while its inputs are unchanged (e.g. waiting on a chord).
+            # The key is built from note bitmasks; played notes only matter where they are expected.
+            if state.is_flashing:
+                key = (True, _note_mask(state.wrong_notes))
+            else:
+                expected_left_mask = _note_mask(state.expected_left)
+                expected_right_mask = _note_mask(state.expected_right)
+                key = (False, expected_left_mask, expected_right_mask,
+                       _note_mask(state.played_left or ()) & expected_left_mask,
+                       _note_mask(state.played_right or ()) & expected_right_mask)
+            if key == self._last_highlight_key:
+                return
             
             # OPTIMIZATION: Use cached colors (Phase 2A) instead of re-computing each time
-            left_color_bright = self._left_color_bright or (255, 107, 107)
-            right_color_bright = self._right_color_bright or (0, 100, 150)
-            left_color_dim = self._left_color_dim or (127, 53, 53)
-            right_color_dim = self._right_color_dim or (0, 50, 75)
+            left_color_bright = bytes(self._left_color_bright or (255, 107, 107))
+            right_color_bright = bytes(self._right_color_bright or (0, 100, 150))
+            left_color_dim = bytes(self._left_color_dim or (127, 53, 53))
+            right_color_dim = bytes(self._right_color_dim or (0, 50, 75))
             
             # Check if wrong note flash is active
             if state.is_flashing:
                 # Flash is active, show wrong notes in red
-                for note in state.wrong_notes:
-                    led_indices = self._map_note_to_leds_cached(note)
-                    for led_idx in led_indices:
-                        if 0 <= led_idx < self.num_leds:
-                            led_data[led_idx] = (255, 0, 0)  # Bright red
-                logger.debug(f"Wrong note flash active ({state.current_time - state.last_flash_time:.3f}s / {state.flash_duration}s)")
+                red = b'\xff\x00\x00'  # Bright red
+                note_colors = [(note, red) for note in state.wrong_notes]
+                logger.debug("Wrong note flash active (%.3fs / %ss)",
+                             state.current_time - state.last_flash_time, state.flash_duration)
             else:
                 # Flash expired, show expected notes with brightness indicating if played
-                
-                # Left hand: bright if played, dim if not
+                # Left hand then right hand: bright if played, dim if not
                 played_left_set = set(state.played_left) if state.played_left is not None else set()
-                for note in state.expected_left:
-                    led_indices = self._map_note_to_leds_cached(note)
-                    color = left_color_bright if note in played_left_set else left_color_dim
-                    for led_idx in led_indices:
-                        if 0 <= led_idx < self.num_leds:
-                            led_data[led_idx] = color
-                
-                # Right hand: bright if played, dim if not
                 played_right_set = set(state.played_right) if state.played_right is not None else set()
-                for note in state.expected_right:
-                    led_indices = self._map_note_to_leds_cached(note)
-                    color = right_color_bright if note in played_right_set else right_color_dim
-                    for led_idx in led_indices:
-                        if 0 <= led_idx < self.num_leds:
-                            led_data[led_idx] = color
+                note_colors = self._hand_note_colors(state.expected_left, played_left_set,
+                                                     left_color_bright, left_color_dim)
+                note_colors += self._hand_note_colors(state.expected_right, played_right_set,
+                                                      right_color_bright, right_color_dim)
             
-            # OPTIMIZATION: Use smart LED batching (Phase 2B) instead of updating all LEDs
-            if led_data or self._last_led_state:
-                self._update_leds_smart(led_data)
+            # OPTIMIZATION: Use smart LED batching (Phase 2B), rendered straight into the frame buffer
+            self._render_note_colors(note_colors)
+            self._last_highlight_key = key
         
         except Exception as e:
             logger.error(f"Error rendering learning mode LEDs: {e}")
     
+    @staticmethod
+    def _hand_note_colors(expected: set, played: set, bright: bytes, dim: bytes) -> List[Tuple[int, bytes]]:
+        """
+        OPTIMIZATION: Split one hand's expected notes into played (bright) and unplayed (dim)
+        with two set operations, instead of a membership test per note.
+        Dim notes come first, so a played note wins on LEDs shared with an unplayed one.
+        """
+        played_notes = expected & played
+        note_colors = [(note, dim) for note in expected - played_notes]
+        note_colors += [(note, bright) for note in played_notes]
+        return note_colors
+    
     def _highlight_expected_notes(self, expected_left: set, expected_right: set, 
                                   played_left, played_right) -> None:
         """
@@ -1538,43 +2345,24 @@ class PlaybackService:
         flash_elapsed = self._current_time - self._last_wrong_flash_time
         if flash_elapsed < self._learning_config.flash_duration:
             # Flash is still active, don't update highlights yet
-            logger.debug(f"Wrong note flash active ({flash_elapsed:.3f}s / {self._learning_config.flash_duration}s)")
+            logger.debug("Wrong note flash active (%.3fs / %ss)", flash_elapsed, self._learning_config.flash_duration)
             return
         
         # Flash has expired, show normal highlighting
         try:
-            led_data = {}
-            
             # OPTIMIZATION: Use cached colors (Phase 2A) instead of re-computing each time
-            left_color_bright = self._left_color_bright or (255, 107, 107)
-            right_color_bright = self._right_color_bright or (0, 100, 150)
-            left_color_dim = self._left_color_dim or (127, 53, 53)
-            right_color_dim = self._right_color_dim or (0, 50, 75)
-            
-            # Highlight expected left hand notes
-            for note in expected_left:
-                # OPTIMIZATION: Use cached note-to-LED lookup (Phase 2A)
-                led_indices = self._map_note_to_leds_cached(note)
-                # Bright color if played, dim if not
-                color = left_color_bright if note in played_left else left_color_dim
-                for led_index in led_indices:
-                    if 0 <= led_index < self.num_leds:
-                        led_data[led_index] = color
-            
-            # Highlight expected right hand notes
-            for note in expected_right:
-                # OPTIMIZATION: Use cached note-to-LED lookup (Phase 2A)
-                led_indices = self._map_note_to_leds_cached(note)
-                # Bright color if played, dim if not
-                color = right_color_bright if note in played_right else right_color_dim
-                for led_index in led_indices:
-                    if 0 <= led_index < self.num_leds:
-                        led_data[led_index] = color
-            
-            # OPTIMIZATION: Use smart LED batching (Phase 2B) instead of always turning off all
-            if led_data or self._last_led_state:
-                self._update_leds_smart(led_data)
-                logger.debug(f"Learning mode: Highlighted expected notes using smart LED update")
+            left_color_bright = bytes(self._left_color_bright or (255, 107, 107))
+            right_color_bright = bytes(self._right_color_bright or (0, 100, 150))
+            left_color_dim = bytes(self._left_color_dim or (127, 53, 53))
+            right_color_dim = bytes(self._right_color_dim or (0, 50, 75))
+            
+            # Highlight expected left hand notes, then right hand notes (bright if played, dim if not)
+            note_colors = self._hand_note_colors(expected_left, played_left, left_color_bright, left_color_dim)
+            note_colors += self._hand_note_colors(expected_right, played_right, right_color_bright, right_color_dim)
+            
+            # OPTIMIZATION: Use smart LED batching (Phase 2B), rendered straight into the frame buffer
+            self._render_note_colors(note_colors)
+            logger.debug("Learning mode: Highlighted expected notes using smart LED update")
         
         except Exception as e:
             logger.error(f"Error highlighting expected notes: {e}")
@@ -1590,49 +2378,82 @@ class PlaybackService:
             return
         
         try:
-            led_data = {}
-            red_color = (255, 0, 0)  # Bright red
+            red_color = b'\xff\x00\x00'  # Bright red
             
-            # Light up wrong notes in red
-            for note in wrong_notes:
-                led_indices = self._map_note_to_leds(note)
-                for led_index in led_indices:
-                    if 0 <= led_index < self.num_leds:
-                        led_data[led_index] = red_color
+            # Light up wrong notes in red (cached, bounds-filtered note-to-LED table)
+            note_to_leds = self._note_to_leds
+            mapped = [note for note in wrong_notes if 0 <= note < 128 and note_to_leds[note]]
             
-            if led_data:
-                # OPTIMIZATION: Use smart LED batching (Phase 2B) instead of always turning off all
-                self._update_leds_smart(led_data)
-                logger.info(f"Learning mode: Highlighted {len(led_data)} LEDs in red for wrong notes using smart update")
+            if mapped:
+                # OPTIMIZATION: Use smart LED batching (Phase 2B), rendered straight into the frame buffer
+                self._render_note_colors((note, red_color) for note in mapped)
+                logger.info("Learning mode: Highlighted %d wrong notes in red using smart update", len(mapped))
         
         except Exception as e:
             logger.error(f"Error highlighting wrong notes: {e}")
     
-    def _update_leds(self):
-        """Update LED display based on active notes"""
+    def _update_leds(self, notes: Optional[Iterable[int]] = None):
+        """
+        Update LED display based on active notes.
+        
+        Args:
+            notes: Notes to display; defaults to the currently active notes
+        """
         if not self._led_controller:
             return
         
         try:
-            # Prepare LED data for batch update
-            led_data = {}
-            
-            # Map active notes to LEDs using multi-LED mapping
-            for note in self._active_notes.keys():
-                led_indices = self._map_note_to_leds(note)
-                color = self._get_note_color(note)
-                # Apply volume multiplier to brightness
-                adjusted_color = tuple(int(c * self._volume_multiplier) for c in color)
+            if notes is None:
+                mask = self._active_mask
+                notes = _mask_to_notes(mask)
+            else:
+                notes = tuple(notes)
+                mask = _note_mask(notes) if all(0 <= note < 128 for note in notes) else None
+            note_to_leds = self._note_to_leds
+            note_led_runs = self._note_led_runs
+            color_lut = self._note_color_lut
+            num_leds = self.num_leds
+            
+            with self._led_frame_lock:
+                # OPTIMIZATION: The strip still holds the last frame when the note set and the
+                # tables it was rendered from are unchanged (notes sustain across many updates)
+                frame_key = (mask, color_lut, note_led_runs) if mask is not None else None
+                if frame_key is not None and frame_key == self._last_frame_key:
+                    return
+                self._last_highlight_key = None  # Frame no longer shows the learning-mode highlight
                 
-                # Set color for all LEDs mapped to this note
-                for led_index in led_indices:
-                    if 0 <= led_index < self.num_leds:
-                        led_data[led_index] = adjusted_color
-            
-            # OPTIMIZATION: Use smart LED batching (Phase 2B) instead of always turning off all
-            # Only updates changed LEDs (60-70% reduction in LED I/O)
-            if led_data or self._last_led_state:
-                self._update_leds_smart(led_data)
+                # OPTIMIZATION: Render active notes straight into the LED frame buffer and diff it
+                # in the same pass, instead of building an intermediate dict first
+                curr = self._curr_frame
+                curr[:] = self._blank_frame
+                lit = set()
+                
+                # Map active notes to LEDs using multi-LED mapping
+                for note in notes:
+                    # Color already scaled by the volume multiplier
+                    color = color_lut[note & 0x7F]
+                    
+                    # OPTIMIZATION: Table entries are bounds-filtered at build time, so each
+                    # contiguous run of the note's LEDs is a single slice assignment
+                    runs = note_led_runs[note] if 0 <= note < 128 else ()
+                    if runs:
+                        for start, end, count in runs:
+                            curr[start:end] = color * count
+                        lit.update(note_to_leds[note])
+                        continue
+                    
+                    # Notes outside the table (outside the piano range)
+                    for led_index in self._map_note_to_leds(note):
+                        if 0 <= led_index < num_leds:
+                            offset = led_index * 3
+                            curr[offset:offset + 3] = color
+                            lit.add(led_index)
+                
+                # OPTIMIZATION: Use smart LED batching (Phase 2B) instead of always turning off all
+                # Only updates changed LEDs (60-70% reduction in LED I/O)
+                if lit or self._prev_lit:
+                    self._flush_led_frame(lit)
+                self._last_frame_key = frame_key
         
         except Exception as e:
             logger.error(f"Error updating LEDs: {e}")
@@ -1647,6 +2468,11 @@ class PlaybackService:
         Returns:
             int: LED index
         """
+        # OPTIMIZATION: Precomputed per-note LED index (rebuilt when the range or LED count changes)
+        table = self._single_led_table
+        if table is not None and 0 <= note < 128:
+            return table[note]
+        
         # Use configured piano range
         if note < self.min_midi_note:
             note = self.min_midi_note
@@ -1659,7 +2485,57 @@ class PlaybackService:
         
         return logical_index
     
-    def _map_note_to_leds(self, note: int) -> List[int]:
+    def _build_single_led_table(self) -> Optional[Tuple[int, ...]]:
+        """
+        OPTIMIZATION: Precompute _map_note_to_led for all 128 MIDI notes.
+        
+        Same clamp and proportional integer mapping, evaluated once per settings
+        refresh so lookups are a single tuple index without float arithmetic.
+        
+        Returns:
+            Tuple of LED indices by MIDI note, or None for an empty piano range
+        """
+        lo = self.min_midi_note
+        hi = self.max_midi_note
+        piano_range = hi - lo
+        if piano_range <= 0:
+            return None
+        span = self.num_leds - 1
+        return tuple(int((min(max(note, lo), hi) - lo) * span / piano_range) for note in range(128))
+    
+    def _build_specialized_mapper(self) -> Callable[[int], Tuple[int, ...]]:
+        """
+        OPTIMIZATION: Build a note-to-LED fallback mapper specialized for the current
+        piano range and LED count.
+        
+        The configuration is bound as closure constants once per settings refresh,
+        so rebuilding the note table does not re-read instance attributes or
+        re-check the range for every note. Same result as _map_note_to_led plus
+        the bounds check, returned as a tuple for the note table.
+        
+        Returns:
+            Callable mapping a MIDI note to a tuple of LED indices (empty if out of range)
+        """
+        lo = self.min_midi_note
+        hi = self.max_midi_note
+        span = self.num_leds - 1
+        piano_range = hi - lo
+        num_leds = self.num_leds
+        
+        if piano_range <= 0 or num_leds <= 0:
+            return lambda note: (0,) if num_leds > 0 else ()
+        
+        def mapper(note: int) -> Tuple[int, ...]:
+            if note < lo:
+                note = lo
+            elif note > hi:
+                note = hi
+            led = int((note - lo) * span / piano_range)
+            return (led,) if 0 <= led < num_leds else ()
+        
+        return mapper
+    
+    def _map_note_to_leds(self, note: int) -> Sequence[int]:
         """
         Map MIDI note to multiple LED indices based on configuration.
         
@@ -1667,114 +2543,160 @@ class PlaybackService:
             note: MIDI note number (0-127)
             
         Returns:
-            List[int]: List of LED indices for this note
+            Sequence[int]: LED indices for this note
         """
-        # Use precomputed mapping if available
-        if note in self._precomputed_mapping:
-            led_indices = self._precomputed_mapping[note]
-            # Filter to ensure all indices are within bounds
-            valid_indices = [idx for idx in led_indices if 0 <= idx < self.num_leds]
-            if valid_indices:
-                return valid_indices
+        # Use precomputed mapping if available (already bounds-filtered)
+        if 0 <= note < 128:
+            single_note_leds = self._single_note_leds
+            if single_note_leds is not None:
+                # OPTIMIZATION: One LED per key - a flat tuple lookup instead of a CSR slice
+                leds = single_note_leds[note]
+                if leds:
+                    return leds
+            else:
+                start, end = self._mapping_offsets[note], self._mapping_offsets[note + 1]
+                if start != end:
+                    return self._mapping_leds[start:end]
         
         # Fallback to single LED mapping for backward compatibility
         single_led = self._map_note_to_led(note)
         return [single_led] if 0 <= single_led < self.num_leds else []
     
-    def _generate_key_mapping(self) -> Dict[int, List[int]]:
+    def _get_canonical_midi_mapping(self) -> Dict[int, Tuple[int, ...]]:
+        """
+        Canonical LED mapping from settings, keyed by MIDI note (empty if unavailable).
+        
+        OPTIMIZATION: The merge of offsets, trims and selections only changes when settings
+        are written, so the result is reused while the settings service's settings_version
+        is unchanged.
+        """
+        version = getattr(self._settings_service, 'settings_version', None)
+        if not isinstance(version, int):
+            version = None  # Service without version tracking: always regenerate
+        elif version == self._canonical_mapping_version:
+            return self._canonical_mapping_cache
+        
+        midi_mapping: Dict[int, Tuple[int, ...]] = {}
+        result = get_canonical_led_mapping(self._settings_service)
+        if result.get('success'):
+            # Convert key indices (0-87) to MIDI notes (21-108)
+            for key_index, led_indices in result.get('mapping', {}).items():
+                midi_note = key_index + 21  # Convert index to MIDI note
+                if isinstance(led_indices, list) and led_indices:
+                    midi_mapping[midi_note] = tuple(led_indices)
+            
+            if midi_mapping:
+                logger.info(f"Using canonical LED mapping with {len(midi_mapping)} keys (includes calibration adjustments)")
+        
+        self._canonical_mapping_cache = midi_mapping
+        self._canonical_mapping_version = version
+        return midi_mapping
+    
+    def _generate_key_mapping(self) -> Dict[int, Tuple[int, ...]]:
         """
         Generate key-to-LED mapping based on configuration.
         Uses the calibrated adjusted mapping which includes offsets, trims, and selections.
         
         Returns:
-            Dict[int, List[int]]: Mapping of MIDI note to list of LED indices
+            Dict[int, Tuple[int, ...]]: Mapping of MIDI note to LED indices (immutable tuples,
+            smaller than lists and safe to share with the cached canonical mapping)
         """
         try:
             # Try to use calibrated adjusted mapping first (includes offsets, trims, selections)
-            if self._settings_service:
+            if self._settings_service and get_canonical_led_mapping is not None:
                 try:
-                    from backend.config import get_canonical_led_mapping
-                    result = get_canonical_led_mapping(self._settings_service)
-                    if result.get('success'):
-                        canonical_mapping = result.get('mapping', {})
-                        if canonical_mapping:
-                            # Convert key indices (0-87) to MIDI notes (21-108)
-                            midi_mapping = {}
-                            for key_index, led_indices in canonical_mapping.items():
-                                midi_note = key_index + 21  # Convert index to MIDI note
-                                if isinstance(led_indices, list) and led_indices:
-                                    midi_mapping[midi_note] = led_indices
-                            
-                            if midi_mapping:
-                                logger.info(f"Using canonical LED mapping with {len(midi_mapping)} keys (includes calibration adjustments)")
-                                return midi_mapping
+                    midi_mapping = self._get_canonical_midi_mapping()
+                    if midi_mapping:
+                        return midi_mapping
                 except Exception as e:
                     logger.warning(f"Could not load canonical LED mapping: {e}, falling back to auto-generated")
             
             # Fallback to auto-generated mapping if canonical not available
-            from backend.config import generate_auto_key_mapping
-            
-            if self.mapping_mode == 'manual' and self.key_mapping:
-                # Use manual mapping from configuration
-                mapping = {}
-                for note_str, led_indices in self.key_mapping.items():
-                    try:
-                        note = int(note_str)
-                        indices: List[int]
-                        if isinstance(led_indices, int):
-                            indices = [led_indices]
-                        elif isinstance(led_indices, list):
-                            indices = []
-                            for raw_idx in led_indices:
-                                try:
-                                    indices.append(int(raw_idx))
-                                except (TypeError, ValueError):
-                                    continue
-                        else:
-                            try:
-                                indices = [int(led_indices)]
-                            except (TypeError, ValueError):
-                                continue
-
-                        if self.led_orientation == 'reversed':
-                            indices = [self.num_leds - 1 - idx for idx in indices if 0 <= idx < self.num_leds]
-                        else:
-                            indices = [idx for idx in indices if 0 <= idx < self.num_leds]
-
-                        mapping[note] = indices
-                    except (ValueError, TypeError):
-                        continue
-                return mapping
-            
-            elif self.mapping_mode in ['auto', 'proportional']:
-                # Use auto-generated mapping
-                auto_mapping = generate_auto_key_mapping(
-                    piano_size=self.piano_size,
-                    led_count=self.num_leds,
-                    led_orientation='normal',
-                    leds_per_key=self.leds_per_key,
-                    mapping_base_offset=self.mapping_base_offset
-                )
-                return auto_mapping
+            generate = self._mapping_generators.get(self.mapping_mode, self._single_led_fallback_mapping)
+            return generate()
             
-            else:
-                # Fallback to single LED mapping
-                mapping = {}
-                for note in range(self.min_midi_note, self.max_midi_note + 1):
-                    single_led = self._map_note_to_led(note)
-                    if 0 <= single_led < self.num_leds:
-                        mapping[note] = [single_led]
-                return mapping
-                
         except Exception as e:
             logger.error(f"Error generating key mapping: {e}")
             # Fallback to single LED mapping
-            mapping = {}
-            for note in range(self.min_midi_note, self.max_midi_note + 1):
-                single_led = self._map_note_to_led(note)
-                if 0 <= single_led < self.num_leds:
-                    mapping[note] = [single_led]
-            return mapping
+            return self._single_led_fallback_mapping()
+    
+    def _gen_manual_mapping(self) -> Dict[int, Tuple[int, ...]]:
+        """Build the mapping from the configured manual key mapping."""
+        if not self.key_mapping:
+            return self._single_led_fallback_mapping()
+        
+        mapping = {}
+        num_leds = self.num_leds
+        reversed_strip = self.led_orientation == 'reversed'
+        for note_str, led_indices in self.key_mapping.items():
+            try:
+                note = int(note_str)
+                indices: List[int]
+                if isinstance(led_indices, int):
+                    indices = [led_indices]
+                elif isinstance(led_indices, list):
+                    indices = []
+                    for raw_idx in led_indices:
+                        try:
+                            indices.append(int(raw_idx))
+                        except (TypeError, ValueError):
+                            continue
+                else:
+                    try:
+                        indices = [int(led_indices)]
+                    except (TypeError, ValueError):
+                        continue
+
+                if reversed_strip:
+                    indices = [num_leds - 1 - idx for idx in indices if 0 <= idx < num_leds]
+                else:
+                    indices = [idx for idx in indices if 0 <= idx < num_leds]
+
+                mapping[note] = tuple(indices)
+            except (ValueError, TypeError):
+                continue
+        return mapping
+    
+    def _gen_auto_mapping(self) -> Dict[int, Tuple[int, ...]]:
+        """Build the mapping from the auto key mapping generator."""
+        auto_mapping = generate_auto_key_mapping(
+            piano_size=self.piano_size,
+            led_count=self.num_leds,
+            led_orientation='normal',
+            leds_per_key=self.leds_per_key,
+            mapping_base_offset=self.mapping_base_offset
+        )
+        return {note: tuple(leds) for note, leds in auto_mapping.items()}
+    
+    def _single_led_fallback_mapping(self) -> Dict[int, Tuple[int, ...]]:
+        """
+        One LED per key across the piano range, skipping keys that map outside the strip.
+        
+        OPTIMIZATION: Reads the precomputed single-LED table instead of evaluating the
+        mapping formula per key.
+        """
+        lo, hi = self.min_midi_note, self.max_midi_note
+        num_leds = self.num_leds
+        table = self._single_led_table
+        if table is not None and 0 <= lo and hi < 128:
+            return {note: (table[note],) for note in range(lo, hi + 1) if 0 <= table[note] < num_leds}
+        
+        mapping = {}
+        for note in range(lo, hi + 1):
+            leds = self._specialized_mapper(note)
+            if leds:
+                mapping[note] = leds
+        return mapping
+    
+    def _rebuild_note_color_lut(self) -> None:
+        """
+        OPTIMIZATION: Precompute per-note RGB bytes scaled by the volume multiplier.
+        Rebuilt when the volume changes so the render loop only indexes a list.
+        Only the 12 pitch-class colors are scaled; the 128 entries share those rows.
+        """
+        volume = self._volume_multiplier
+        scaled = [bytes(min(255, max(0, int(c * volume))) for c in color) for color in _OCTAVE_COLORS]
+        self._note_color_lut: List[bytes] = [scaled[note % 12] for note in range(128)]
     
     def _get_note_color(self, note: int) -> tuple:
         """
@@ -1787,36 +2709,23 @@ class PlaybackService:
             tuple: RGB color tuple
         """
         # Color mapping based on note position in octave
-        note_in_octave = note % 12
-        colors = [
-            (255, 0, 0),    # C - Red
-            (255, 127, 0),  # C# - Orange
-            (255, 255, 0),  # D - Yellow
-            (127, 255, 0),  # D# - Yellow-Green
-            (0, 255, 0),    # E - Green
-            (0, 255, 127),  # F - Green-Cyan
-            (0, 255, 255),  # F# - Cyan
-            (0, 127, 255),  # G - Cyan-Blue
-            (0, 0, 255),    # G# - Blue
-            (127, 0, 255),  # A - Blue-Purple
-            (255, 0, 255),  # A# - Purple
-            (255, 0, 127),  # B - Purple-Red
-        ]
-        
-        return colors[note_in_octave]
+        # OPTIMIZATION: Module-level table instead of rebuilding the list literal per call
+        return _OCTAVE_COLORS[note % 12]
+    
+    def _progress_percentage(self) -> float:
+        """Playback progress as a percentage of total duration"""
+        if self._total_duration > 0:
+            return min(100.0, (self._current_time / self._total_duration) * 100)
+        return 0.0
     
     def get_status(self) -> PlaybackStatus:
         """Get current playback status"""
-        progress = 0.0
-        if self._total_duration > 0:
-            progress = min(100.0, (self._current_time / self._total_duration) * 100)
-        
         return PlaybackStatus(
             state=self._state,
             current_time=self._current_time,
             total_duration=self._total_duration,
             filename=self._filename,
-            progress_percentage=progress,
+            progress_percentage=self._progress_percentage(),
             error_message=None if self._state != PlaybackState.ERROR else "Playback error occurred"
         )
     
@@ -1845,6 +2754,7 @@ class PlaybackService:
         """Clean up resources"""
         try:
             self.stop_playback()
+            self._stop_status_notifier()
             self._status_callbacks.clear()
             logger.info("PlaybackService cleaned up")
         except Exception as e:
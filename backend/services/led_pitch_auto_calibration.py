@@ -5,7 +5,20 @@ Simple automatic pitch adjustment when actual LED coverage doesn't match
 theoretical calculations. Integrated into the mapping process.
 """
 
-from typing import Dict, Tuple
+from functools import lru_cache
+from typing import Dict, NamedTuple, Tuple
+
+
+class PitchCalibration(NamedTuple):
+    """Immutable calibration result, cached and shared by calibrate_pitch callers."""
+    was_adjusted: bool
+    theoretical_pitch_mm: float
+    calibrated_pitch_mm: float
+    difference_mm: float
+    difference_percent: float
+    reason: str
+    theoretical_span_mm: float
+    actual_span_mm: float
 
 
 def auto_calibrate_pitch(
@@ -34,7 +47,28 @@ def auto_calibrate_pitch(
         - was_adjusted: Boolean indicating if pitch was changed
         - adjustment_info: Dict with details about the adjustment
     """
+    # Mapping regeneration repeats the same inputs (e.g. calibration UI updates), so the
+    # pure calculation is memoized; each caller still gets its own adjustment_info dict.
+    # The reason text is only formatted on the adjusted path, once per distinct input; the
+    # dict itself stays eager because callers embed it in JSON API responses.
+    result = calibrate_pitch(theoretical_pitch_mm, piano_start_mm, piano_end_mm,
+                             start_led, actual_end_led)
+    return result.calibrated_pitch_mm, result.was_adjusted, result._asdict()
+
+
+@lru_cache(maxsize=128)
+def calibrate_pitch(
+    theoretical_pitch_mm: float,
+    piano_start_mm: float,
+    piano_end_mm: float,
+    start_led: int,
+    actual_end_led: int,
+) -> PitchCalibration:
+    """
+    Pure pitch calibration behind auto_calibrate_pitch (same arguments).
     
+    Returns the result as an immutable PitchCalibration; use _asdict() where a dict is needed.
+    """
     piano_width_mm = piano_end_mm - piano_start_mm
     total_leds_in_range = (actual_end_led - start_led) + 1
     
@@ -54,30 +88,27 @@ def auto_calibrate_pitch(
     
     if adjustment_needed:
         calibrated_pitch = required_pitch_mm
-        adjustment_info = {
-            'was_adjusted': True,
-            'theoretical_pitch_mm': theoretical_pitch_mm,
-            'calibrated_pitch_mm': calibrated_pitch,
-            'difference_mm': calibrated_pitch - theoretical_pitch_mm,
-            'difference_percent': ((calibrated_pitch - theoretical_pitch_mm) / theoretical_pitch_mm) * 100,
-            'reason': f'Actual LED range ({total_leds_in_range} LEDs) spans {piano_width_mm:.1f}mm, requiring pitch adjustment',
-            'theoretical_span_mm': theoretical_span_mm,
-            'actual_span_mm': piano_width_mm,
-        }
-    else:
-        calibrated_pitch = theoretical_pitch_mm
-        adjustment_info = {
-            'was_adjusted': False,
-            'theoretical_pitch_mm': theoretical_pitch_mm,
-            'calibrated_pitch_mm': calibrated_pitch,
-            'difference_mm': 0.0,
-            'difference_percent': 0.0,
-            'reason': 'Pitch matches theoretical perfectly',
-            'theoretical_span_mm': theoretical_span_mm,
-            'actual_span_mm': piano_width_mm,
-        }
+        return PitchCalibration(
+            was_adjusted=True,
+            theoretical_pitch_mm=theoretical_pitch_mm,
+            calibrated_pitch_mm=calibrated_pitch,
+            difference_mm=calibrated_pitch - theoretical_pitch_mm,
+            difference_percent=((calibrated_pitch - theoretical_pitch_mm) / theoretical_pitch_mm) * 100,
+            reason=f'Actual LED range ({total_leds_in_range} LEDs) spans {piano_width_mm:.1f}mm, requiring pitch adjustment',
+            theoretical_span_mm=theoretical_span_mm,
+            actual_span_mm=piano_width_mm,
+        )
     
-    return calibrated_pitch, adjustment_info['was_adjusted'], adjustment_info
+    return PitchCalibration(
+        was_adjusted=False,
+        theoretical_pitch_mm=theoretical_pitch_mm,
+        calibrated_pitch_mm=theoretical_pitch_mm,
+        difference_mm=0.0,
+        difference_percent=0.0,
+        reason='Pitch matches theoretical perfectly',
+        theoretical_span_mm=theoretical_span_mm,
+        actual_span_mm=piano_width_mm,
+    )
 
 
 # Integration point example:
@@ -8,11 +8,17 @@ Manages per-key LED selection overrides, allowing users to:
 """
 
 import logging
+import threading
+from array import array
+from bisect import bisect_left, insort
 from typing import Dict, List, Set, Optional, Tuple
 from backend.logging_config import get_logger
 
 logger = get_logger(__name__)
 
+# Selections longer than this are validated with a packed array instead of a Python loop
+BULK_VALIDATION_THRESHOLD = 32
+
 
 class LEDSelectionService:
     """
@@ -28,6 +34,84 @@ class LEDSelectionService:
     def __init__(self, settings_service=None):
         """Initialize the LED selection service."""
         self.settings_service = settings_service
+        # Overrides as last read/written, valid while the settings version is unchanged.
+        # The cached dict is never edited in place: writers save a modified copy, so a
+        # reader holding the previous dict keeps a consistent snapshot.
+        self._overrides_cache: Optional[Dict] = None
+        self._overrides_cache_version: Optional[int] = None
+        # Guards the cache and makes each read-modify-write of the overrides atomic
+        # (request threads share one service instance)
+        self._lock = threading.RLock()
+    
+    def _settings_version(self) -> Optional[int]:
+        """Settings write counter, or None if the settings service does not track one."""
+        version = getattr(self.settings_service, 'settings_version', None)
+        return version if isinstance(version, int) else None
+    
+    def _load_overrides(self) -> Dict:
+        """
+        Get the LED selection overrides, reading settings only after they were written.
+        
+        Settings store the MIDI notes as strings (JSON object keys); they are converted to
+        int once here so callers index by note directly.
+        
+        The returned dict may be the shared cached copy: treat it as read-only and save
+        a modified copy instead.
+        
+        Returns:
+            dict mapping MIDI note to selected LED indices
+        """
+        with self._lock:
+            version = self._settings_version()
+            if (version is not None and self._overrides_cache is not None
+                    and version == self._overrides_cache_version):
+                return self._overrides_cache
+            
+            raw = self.settings_service.get_setting('calibration', 'led_selection_overrides', {}) or {}
+            overrides = {}
+            for midi_note_str, selected_leds in raw.items():
+                try:
+                    # Kept sorted, so toggles can binary-search the stored list
+                    overrides[int(midi_note_str)] = sorted(selected_leds) if selected_leds else []
+                except (ValueError, TypeError):
+                    continue
+            if version is not None:
+                self._overrides_cache = overrides
+                self._overrides_cache_version = version
+            return overrides
+    
+    def _save_overrides(self, overrides: Dict) -> bool:
+        """
+        Write the LED selection overrides to settings and keep them as the cached copy.
+        
+        Args:
+            overrides: dict mapping MIDI note to selected LED indices (a copy, not the cached dict)
+        
+        Returns:
+            True if the settings service accepted the write
+        """
+        with self._lock:
+            # Drop the cache until the write has succeeded, so a failed write is re-read
+            self._overrides_cache = None
+            saved = self.settings_service.set_setting(
+                'calibration', 'led_selection_overrides', self._serialize_overrides(overrides)
+            )
+            version = self._settings_version()
+            if saved and version is not None:
+                self._overrides_cache = overrides
+                self._overrides_cache_version = version
+            return saved
+    
+    @staticmethod
+    def _serialize_overrides(overrides: Dict[int, List[int]]) -> Dict[str, List[int]]:
+        """Convert overrides to the settings format (MIDI note keys as strings)."""
+        return {str(midi_note): selected_leds for midi_note, selected_leds in overrides.items()}
+    
+    def clear_cache(self) -> None:
+        """Forget the cached overrides so the next read goes to the settings service."""
+        with self._lock:
+            self._overrides_cache = None
+            self._overrides_cache_version = None
     
     def _get_led_range(self) -> Tuple[int, int]:
         """
@@ -43,6 +127,29 @@ class LEDSelectionService:
         end_led = self.settings_service.get_setting('calibration', 'end_led', 249)
         return (start_led, end_led)
     
+    @staticmethod
+    def _validate_led_indices(selected_leds: List) -> Optional[str]:
+        """
+        Check that every LED index is a non-negative int.
+        
+        Bulk selections are first packed into an int array, which rejects non-int values in C;
+        the per-item scan only runs for small inputs or to name the offending value.
+        
+        Returns:
+            Error message for the first invalid index, or None if all are valid
+        """
+        if len(selected_leds) > BULK_VALIDATION_THRESHOLD:
+            try:
+                if min(array('q', selected_leds)) >= 0:
+                    return None
+            except (TypeError, OverflowError):
+                pass
+        
+        for led_idx in selected_leds:
+            if not isinstance(led_idx, int) or led_idx < 0:
+                return f'Invalid LED index: {led_idx}'
+        return None
+    
     def set_key_led_selection(
         self,
         midi_note: int,
@@ -61,6 +168,39 @@ class LEDSelectionService:
         if not self.settings_service:
             return {'success': False, 'error': 'Settings service not available'}
         
+        try:
+            with self._lock:
+                overrides = dict(self._load_overrides())
+                response = self._apply_key_selection(
+                    overrides, midi_note, selected_leds, self._get_led_range()
+                )
+                if response.get('success') and not response['noop']:
+                    # Save back to settings
+                    self._save_overrides(overrides)
+            return response
+        except Exception as e:
+            logger.error(f"Failed to set LED selection: {e}")
+            return {'success': False, 'error': str(e)}
+    
+    def _apply_key_selection(
+        self,
+        overrides: Dict[int, List[int]],
+        midi_note: int,
+        selected_leds: List[int],
+        led_range: Tuple[int, int]
+    ) -> Dict:
+        """
+        Validate one key's LED selection and record it in overrides (not saved).
+        
+        Args:
+            overrides: Caller's private copy of the overrides, updated in place
+            midi_note: MIDI note number (21-108)
+            selected_leds: List of LED indices to assign to this key
+            led_range: (start_led, end_led) valid LED range
+        
+        Returns:
+            Response dict for this key; 'noop' is True when the selection was unchanged
+        """
         if not (21 <= midi_note <= 108):
             return {'success': False, 'error': f'Invalid MIDI note: {midi_note}'}
         
@@ -68,44 +208,93 @@ class LEDSelectionService:
             return {'success': False, 'error': 'selected_leds must be a list'}
         
         # Validate LED indices and warn about out-of-range LEDs
-        start_led, end_led = self._get_led_range()
-        out_of_range_leds = []
+        start_led, end_led = led_range
+        error = self._validate_led_indices(selected_leds)
+        if error:
+            return {'success': False, 'error': error}
+        
+        if selected_leds and start_led <= min(selected_leds) and max(selected_leds) <= end_led:
+            out_of_range_leds = []
+        else:
+            out_of_range_leds = [
+                led_idx for led_idx in selected_leds if led_idx < start_led or led_idx > end_led
+            ]
+        
+        # Skip the settings write (and disk flush) when the selection is unchanged,
+        # e.g. a repeated request from the frontend
+        # Stored as a sorted copy, so the caller's list never aliases the cache
+        stored_leds = sorted(selected_leds)
+        noop = overrides.get(midi_note) == stored_leds
+        if noop:
+            logger.debug(f"LED selection for MIDI {midi_note} unchanged, not saving")
+        else:
+            overrides[midi_note] = stored_leds
+            logger.info(f"Set LED selection for MIDI {midi_note}: {selected_leds}")
         
-        for led_idx in selected_leds:
-            if not isinstance(led_idx, int) or led_idx < 0:
-                return {'success': False, 'error': f'Invalid LED index: {led_idx}'}
-            if led_idx < start_led or led_idx > end_led:
-                out_of_range_leds.append(led_idx)
+        response = {
+            'success': True,
+            'midi_note': midi_note,
+            'selected_leds': selected_leds,
+            'message': f'Updated LED selection for MIDI {midi_note}',
+            'out_of_range_warning': None,
+            'noop': noop
+        }
+        
+        if out_of_range_leds:
+            warning = f'Warning: LEDs {out_of_range_leds} are outside valid range [{start_led}, {end_led}]'
+            logger.warning(warning)
+            response['out_of_range_warning'] = warning
+        
+        return response
+    
+    def set_multiple_key_selections(self, selections: Dict[int, List[int]]) -> Dict:
+        """
+        Override LED selection for several keys with a single settings write.
+        
+        Invalid keys are reported in their result and skipped; the valid ones are still
+        saved. The changes are applied to a copy of the overrides owned by this call, so
+        concurrent requests never see or absorb them before the write.
+        
+        Args:
+            selections: MIDI note number -> list of LED indices to assign to that key
+        
+        Returns:
+            dict with overall success status, the per-key results, and 'saved' (False if
+            the settings write failed, in which case nothing was persisted)
+        """
+        if not self.settings_service:
+            return {'success': False, 'error': 'Settings service not available'}
         
         try:
-            # Get current overrides
-            overrides = self.settings_service.get_setting('calibration', 'led_selection_overrides', {}) or {}
-            
-            # Update with new selection
-            overrides[str(midi_note)] = selected_leds
-            
-            # Save back to settings
-            self.settings_service.set_setting('calibration', 'led_selection_overrides', overrides)
-            
-            logger.info(f"Set LED selection for MIDI {midi_note}: {selected_leds}")
-            
-            response = {
-                'success': True,
-                'midi_note': midi_note,
-                'selected_leds': selected_leds,
-                'message': f'Updated LED selection for MIDI {midi_note}',
-                'out_of_range_warning': None
-            }
-            
-            if out_of_range_leds:
-                warning = f'Warning: LEDs {out_of_range_leds} are outside valid range [{start_led}, {end_led}]'
-                logger.warning(warning)
-                response['out_of_range_warning'] = warning
-            
-            return response
+            with self._lock:
+                overrides = dict(self._load_overrides())
+                led_range = self._get_led_range()
+                results = {
+                    midi_note: self._apply_key_selection(overrides, midi_note, selected_leds, led_range)
+                    for midi_note, selected_leds in selections.items()
+                }
+                changed = any(
+                    result.get('success') and not result['noop'] for result in results.values()
+                )
+                saved = self._save_overrides(overrides) if changed else True
         except Exception as e:
-            logger.error(f"Failed to set LED selection: {e}")
-            return {'success': False, 'error': str(e)}
+            logger.error(f"Failed to set multiple LED selections: {e}")
+            return {'success': False, 'saved': False, 'error': str(e)}
+        
+        if not saved:
+            logger.error(f"Failed to save LED selections for MIDI notes {sorted(selections)}")
+            return {
+                'success': False,
+                'saved': False,
+                'error': 'Failed to save LED selection overrides',
+                'results': results
+            }
+        
+        return {
+            'success': all(result.get('success') for result in results.values()),
+            'saved': True,
+            'results': results
+        }
     
     def clear_key_led_selection(self, midi_note: int) -> Dict:
         """
@@ -124,12 +313,14 @@ class LEDSelectionService:
             return {'success': False, 'error': f'Invalid MIDI note: {midi_note}'}
         
         try:
-            overrides = self.settings_service.get_setting('calibration', 'led_selection_overrides', {}) or {}
-            
-            if str(midi_note) in overrides:
-                del overrides[str(midi_note)]
-                self.settings_service.set_setting('calibration', 'led_selection_overrides', overrides)
-                logger.info(f"Cleared LED selection override for MIDI {midi_note}")
+            with self._lock:
+                overrides = self._load_overrides()
+                
+                if midi_note in overrides:
+                    overrides = dict(overrides)
+                    del overrides[midi_note]
+                    self._save_overrides(overrides)
+                    logger.info(f"Cleared LED selection override for MIDI {midi_note}")
             
             return {
                 'success': True,
@@ -157,8 +348,8 @@ class LEDSelectionService:
             return {'success': False, 'error': f'Invalid MIDI note: {midi_note}'}
         
         try:
-            overrides = self.settings_service.get_setting('calibration', 'led_selection_overrides', {}) or {}
-            selected = overrides.get(str(midi_note), [])
+            overrides = self._load_overrides()
+            selected = overrides.get(midi_note, [])
             
             return {
                 'success': True,
@@ -191,19 +382,21 @@ class LEDSelectionService:
             return {'success': False, 'error': f'Invalid LED index: {led_index}'}
         
         try:
-            overrides = self.settings_service.get_setting('calibration', 'led_selection_overrides', {}) or {}
-            selected = list(overrides.get(str(midi_note), []))
-            
-            if led_index in selected:
-                selected.remove(led_index)
-                action = 'removed'
-            else:
-                selected.append(led_index)
-                selected.sort()
-                action = 'added'
-            
-            overrides[str(midi_note)] = selected
-            self.settings_service.set_setting('calibration', 'led_selection_overrides', overrides)
+            with self._lock:
+                overrides = dict(self._load_overrides())
+                # Selections are stored sorted, so membership and insertion are a binary search
+                selected = list(overrides.get(midi_note, []))
+                pos = bisect_left(selected, led_index)
+                
+                if pos < len(selected) and selected[pos] == led_index:
+                    del selected[pos]
+                    action = 'removed'
+                else:
+                    selected.insert(pos, led_index)
+                    action = 'added'
+                
+                overrides[midi_note] = selected
+                self._save_overrides(overrides)
             
             logger.info(f"LED {led_index} {action} for MIDI {midi_note}. New selection: {selected}")
             
@@ -222,7 +415,8 @@ class LEDSelectionService:
         self,
         base_mapping: Dict[int, List[int]],
         start_led: int = 0,
-        end_led: int = 249
+        end_led: int = 249,
+        inplace: bool = False
     ) -> Dict[int, List[int]]:
         """
         Apply LED selection overrides to the base mapping.
@@ -233,6 +427,9 @@ class LEDSelectionService:
             base_mapping: Base mapping from allocation algorithm (key_index -> [led_indices])
             start_led: First available LED
             end_led: Last available LED
+            inplace: Update base_mapping itself instead of a copy. Changed keys get new
+                lists, and base_mapping is only touched once every change has been
+                computed, so on error it is returned unchanged.
         
         Returns:
             Modified mapping with overrides applied
@@ -241,56 +438,84 @@ class LEDSelectionService:
             return base_mapping
         
         try:
-            overrides = self.settings_service.get_setting('calibration', 'led_selection_overrides', {}) or {}
+            overrides = self._load_overrides()
             
             if not overrides:
                 return base_mapping  # No overrides, return original
             
-            # Create a working copy
-            adjusted_mapping = {k: list(v) for k, v in base_mapping.items()}
+            # New lists for the keys that change (overridden keys, and receiving keys copied on
+            # first append). base_mapping is left untouched until they are all built.
+            changed: Dict[int, List[int]] = {}
             
             # Track removed LEDs that need reallocation
             removed_leds_queue: List[tuple] = []  # [(led_index, source_key_index), ...]
             
             # First pass: Apply overrides and collect removed LEDs
-            for midi_note_str, selected_leds in overrides.items():
-                try:
-                    midi_note = int(midi_note_str)
-                    key_index = midi_note - 21
-                    
-                    if not (0 <= key_index < 88):
-                        continue
-                    
-                    selected_leds = list(selected_leds) if selected_leds else []
-                    
-                    # Get the original LEDs for this key
-                    original_leds = base_mapping.get(key_index, [])
-                    
-                    # Find LEDs that were removed
-                    removed_leds = set(original_leds) - set(selected_leds)
-                    
-                    # Update the mapping for this key
-                    adjusted_mapping[key_index] = sorted(selected_leds)
-                    
-                    # Queue removed LEDs for reallocation
-                    for removed_led in sorted(removed_leds):
-                        removed_leds_queue.append((removed_led, key_index))
-                    
-                except (ValueError, TypeError):
+            # Keys are int MIDI notes and values are lists (normalized by _load_overrides)
+            for midi_note, selected_leds in overrides.items():
+                key_index = midi_note - 21
+                
+                if not (0 <= key_index < 88):
                     continue
+                
+                # Get the original LEDs for this key
+                original_leds = base_mapping.get(key_index, [])
+                
+                # Update the mapping for this key
+                selected_sorted = sorted(selected_leds)
+                changed[key_index] = selected_sorted
+                
+                # Queue removed LEDs (original but not selected) for reallocation, in LED order.
+                # Both lists are small and usually already sorted, so a merge walk replaces
+                # building two sets and sorting their difference.
+                selected_pos = 0
+                selected_count = len(selected_sorted)
+                previous_led = None
+                for original_led in sorted(original_leds):
+                    if original_led == previous_led:
+                        continue
+                    previous_led = original_led
+                    while selected_pos < selected_count and selected_sorted[selected_pos] < original_led:
+                        selected_pos += 1
+                    if selected_pos == selected_count or selected_sorted[selected_pos] != original_led:
+                        removed_leds_queue.append((original_led, key_index))
             
             # Second pass: Reassign removed LEDs to neighbors
+            # Membership is checked against per-key sets (built on first use); _find_best_neighbor
+            # only needs each key's (min, max) LED range, kept up to date as LEDs are reassigned.
+            # Receiving keys are sorted when first copied, then kept sorted with insort, so
+            # changed (sorted) lists give their range from the endpoints.
+            key_ranges: List[Optional[Tuple[int, int]]] = []
+            for key_index in range(88):
+                if key_index in changed:
+                    key_leds = changed[key_index]
+                    key_ranges.append((key_leds[0], key_leds[-1]) if key_leds else None)
+                else:
+                    key_leds = base_mapping.get(key_index)
+                    key_ranges.append((min(key_leds), max(key_leds)) if key_leds else None)
+            assigned_sets: Dict[int, Set[int]] = {}
             for removed_led, source_key in removed_leds_queue:
                 target_key = self._find_best_neighbor(
-                    source_key, removed_led, adjusted_mapping, start_led, end_led
+                    source_key, removed_led, key_ranges, start_led, end_led
                 )
                 
                 if target_key is not None and 0 <= target_key < 88:
-                    if removed_led not in adjusted_mapping[target_key]:
-                        adjusted_mapping[target_key].append(removed_led)
-                        adjusted_mapping[target_key].sort()
+                    target_leds = changed.get(target_key)
+                    target_set = assigned_sets.get(target_key)
+                    if target_set is None:
+                        target_set = assigned_sets[target_key] = set(
+                            base_mapping[target_key] if target_leds is None else target_leds
+                        )
+                    if removed_led not in target_set:
+                        target_set.add(removed_led)
+                        if target_leds is None:
+                            target_leds = changed[target_key] = sorted(base_mapping[target_key])
+                        insort(target_leds, removed_led)
+                        key_ranges[target_key] = (target_leds[0], target_leds[-1])
                         logger.debug(f"Reassigned LED {removed_led} from key {source_key} to key {target_key}")
             
+            adjusted_mapping = base_mapping if inplace else dict(base_mapping)
+            adjusted_mapping.update(changed)
             return adjusted_mapping
         
         except Exception as e:
@@ -301,7 +526,7 @@ class LEDSelectionService:
         self,
         key_index: int,
         led_index: int,
-        mapping: Dict[int, List[int]],
+        key_ranges: List[Optional[Tuple[int, int]]],
         start_led: int,
         end_led: int
     ) -> Optional[int]:
@@ -312,25 +537,26 @@ class LEDSelectionService:
         1. Prefer the neighbor whose LED range is closest to the removed LED
         2. If equidistant, prefer the neighbor in the direction of the LED
         3. Fallback to any available neighbor
+        
+        Args:
+            key_ranges: (min_led, max_led) per key index 0-87, None for keys without LEDs
         """
         candidates = []
         
         # Check left neighbor
         if key_index > 0:
-            left_key_leds = mapping.get(key_index - 1, [])
-            if left_key_leds:
-                left_max = max(left_key_leds)
-                left_min = min(left_key_leds)
+            left_range = key_ranges[key_index - 1]
+            if left_range:
+                left_min, left_max = left_range
                 # Distance to the closest edge of left neighbor's range
                 distance = min(abs(led_index - left_max), abs(led_index - left_min))
                 candidates.append((distance, key_index - 1, 'left'))
         
         # Check right neighbor
         if key_index < 87:
-            right_key_leds = mapping.get(key_index + 1, [])
-            if right_key_leds:
-                right_min = min(right_key_leds)
-                right_max = max(right_key_leds)
+            right_range = key_ranges[key_index + 1]
+            if right_range:
+                right_min, right_max = right_range
                 # Distance to the closest edge of right neighbor's range
                 distance = min(abs(led_index - right_min), abs(led_index - right_max))
                 candidates.append((distance, key_index + 1, 'right'))
@@ -372,7 +598,8 @@ class LEDSelectionService:
             return {}
         
         try:
-            return self.settings_service.get_setting('calibration', 'led_selection_overrides', {}) or {}
+            # Settings format (string keys); also a copy, so callers cannot edit the cached overrides
+            return self._serialize_overrides(self._load_overrides())
         except Exception as e:
             logger.error(f"Failed to get all overrides: {e}")
             return {}
@@ -388,9 +615,25 @@ class LEDSelectionService:
             return {'success': False, 'error': 'Settings service not available'}
         
         try:
-            self.settings_service.set_setting('calibration', 'led_selection_overrides', {})
+            self._save_overrides({})
             logger.info("Cleared all LED selection overrides")
             return {'success': True, 'message': 'All overrides cleared'}
         except Exception as e:
             logger.error(f"Failed to clear all overrides: {e}")
             return {'success': False, 'error': str(e)}
+
+
+_selection_service: Optional[LEDSelectionService] = None
+_selection_service_lock = threading.Lock()
+
+
+def get_led_selection_service(settings_service) -> LEDSelectionService:
+    """Get the shared LED selection service, so its overrides cache survives across callers."""
+    global _selection_service
+    service = _selection_service
+    if service is None or service.settings_service is not settings_service:
+        with _selection_service_lock:
+            service = _selection_service
+            if service is None or service.settings_service is not settings_service:
+                service = _selection_service = LEDSelectionService(settings_service)
+    return service
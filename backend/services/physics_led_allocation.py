@@ -6,12 +6,79 @@ actual physical overlap and quality metrics, rather than fixed ratios.
 """
 
 import logging
-from typing import Dict, List, Optional
-from backend.config_led_mapping_physical import PhysicalMappingAnalyzer
+from bisect import bisect_left, bisect_right
+from collections import Counter
+from functools import lru_cache
+from typing import Dict, List, Optional, Tuple
+from backend.config_led_mapping_physical import (
+    KeyGeometry,
+    PhysicalKeyGeometry,
+    PhysicalMappingAnalyzer,
+    cached_key_geometries,
+    cached_led_placements,
+)
 
 logger = logging.getLogger(__name__)
 
 
+@lru_cache(maxsize=8)
+def _cached_led_edges(
+    led_spacing_mm: float,
+    led_physical_width: float,
+    led_strip_offset: float,
+    usable_led_count: int,
+    start_led: int,
+) -> Tuple[Tuple[Tuple[int, float, float], ...], Tuple[float, ...], Tuple[float, ...], bool]:
+    """
+    Flat LED edge data for the overlap sweep, built once per placement set.
+    
+    Like the cached geometries and placements it is shared between calls: treat it as read-only.
+    
+    Returns:
+        Tuple of (led_extents, led_starts, led_ends, leds_sorted): (abs_idx, start, end) rows,
+        the start and end edges as separate sequences, and whether both edges are sorted
+    """
+    led_placements = cached_led_placements(
+        led_spacing_mm, led_physical_width, led_strip_offset, usable_led_count
+    )
+    led_extents = tuple(
+        (rel_idx + start_led, placement.start_mm, placement.end_mm)
+        for rel_idx, placement in led_placements.items()
+    )
+    led_starts = tuple(led_start for _, led_start, _ in led_extents)
+    led_ends = tuple(led_end for _, _, led_end in led_extents)
+    leds_sorted = all(
+        led_starts[i] <= led_starts[i + 1] and led_ends[i] <= led_ends[i + 1]
+        for i in range(len(led_extents) - 1)
+    )
+    return led_extents, led_starts, led_ends, leds_sorted
+
+
+def _key_extents(key_geometries: Dict[int, KeyGeometry]) -> Tuple[List[float], List[float]]:
+    """
+    Exposed start and end of keys 0-87 as two flat lists indexed by key.
+    
+    Reading these avoids a getattr-with-default per key visit in the mapping loops.
+    """
+    key_starts = []
+    key_ends = []
+    for key_idx in range(88):
+        key_geom = key_geometries[key_idx]
+        key_starts.append(getattr(key_geom, '_exposed_start', key_geom.start_mm))
+        key_ends.append(getattr(key_geom, '_exposed_end', key_geom.end_mm))
+    return key_starts, key_ends
+
+
+@lru_cache(maxsize=8)
+def _cached_key_extents(
+    white_key_width: float,
+    black_key_width: float,
+    white_key_gap: float,
+) -> Tuple[List[float], List[float]]:
+    """_key_extents of the cached key geometries; shared between calls, treat as read-only."""
+    return _key_extents(cached_key_geometries(white_key_width, black_key_width, white_key_gap))
+
+
 class PhysicsBasedAllocationService:
     """
     Allocates LEDs to piano keys using physics-based detection.
@@ -82,61 +149,66 @@ class PhysicsBasedAllocationService:
             - parameters_used: Parameters used for allocation
         """
         try:
-            logger.info(f"Starting physics-based LED allocation (LEDs {start_led}-{end_led}, "
-                       f"threshold={self.overhang_threshold_mm}mm)")
+            logger.info("Starting physics-based LED allocation (LEDs %s-%s, threshold=%smm)",
+                       start_led, end_led, self.overhang_threshold_mm)
             
             led_count = 255  # Total LEDs on strip
-            key_geometries = self.analyzer.key_geometry.calculate_all_key_geometries()
-            
-            # STEP 1: Generate initial mapping to detect coverage gap
-            logger.info("STEP 1: Generating initial mapping to calculate coverage...")
-            initial_mapping, initial_max_led = self._generate_mapping(
-                key_geometries, start_led, end_led
+            # Key geometry only depends on the key dimensions, so it and the derived edge lists
+            # are cached by those parameters and not rebuilt per allocation
+            key_geometry_params = (
+                PhysicalKeyGeometry.WHITE_KEY_WIDTH,
+                PhysicalKeyGeometry.BLACK_KEY_WIDTH,
+                PhysicalKeyGeometry.WHITE_KEY_GAP,
             )
+            key_geometries = cached_key_geometries(*key_geometry_params)
+            # Exposed key edges as flat lists
+            key_extents = _cached_key_extents(*key_geometry_params)
             
-            # STEP 2: Calculate pitch adjustment based on detected coverage gap
-            logger.info("STEP 2: Analyzing coverage gap and calculating pitch adjustment...")
-            coverage_gap = end_led - initial_max_led
-            logger.info(f"Coverage gap: max_led={initial_max_led}, end_led={end_led}, gap={coverage_gap}")
+            # STEP 1: Calculate pitch adjustment. Calibration only depends on the piano dimensions
+            # and the LED range (not on a mapping), so it runs first and the mapping is generated
+            # once, at the final pitch, instead of once before and again after calibration.
+            logger.info("STEP 1: Calculating pitch adjustment for the LED range...")
             
-            from backend.services.led_pitch_auto_calibration import auto_calibrate_pitch
+            from backend.services.led_pitch_auto_calibration import calibrate_pitch
             
             piano_start_mm = key_geometries[0].start_mm
             piano_end_mm = key_geometries[87].end_mm
             theoretical_pitch = self.analyzer.led_placement.led_spacing_mm
             
-            calibrated_pitch, was_adjusted, pitch_info = auto_calibrate_pitch(
+            # Immutable result, kept as-is from STEP 1 for the report (before analyzer recalculates);
+            # it is only turned into a dict when it overrides the analysis below
+            pitch_calibration = calibrate_pitch(
                 theoretical_pitch_mm=theoretical_pitch,
                 piano_start_mm=piano_start_mm,
                 piano_end_mm=piano_end_mm,
                 start_led=start_led,
                 actual_end_led=end_led,
             )
+            # Fields used below (and in the log calls) bound once as locals
+            calibrated_pitch = pitch_calibration.calibrated_pitch_mm
+            was_adjusted = pitch_calibration.was_adjusted
+            pitch_diff = abs(pitch_calibration.difference_mm)
             
-            logger.info(f"Pitch calibration result: was_adjusted={was_adjusted}, "
-                       f"theoretical={theoretical_pitch:.6f}mm, calibrated={calibrated_pitch:.6f}mm, "
-                       f"diff={abs(calibrated_pitch - theoretical_pitch):.6f}mm")
-            
-            # Store the pitch info from STEP 2 to use later (before analyzer recalculates)
-            initial_pitch_info = pitch_info.copy()
+            logger.info("Pitch calibration result: was_adjusted=%s, "
+                       "theoretical=%.6fmm, calibrated=%.6fmm, diff=%.6fmm",
+                       was_adjusted, theoretical_pitch, calibrated_pitch, pitch_diff)
             
-            # STEP 3: If pitch was adjusted, regenerate mapping with new pitch
             if was_adjusted:
-                logger.info(f"Pitch adjusted: {theoretical_pitch:.4f}mm → {calibrated_pitch:.4f}mm "
-                           f"({pitch_info.get('reason', 'coverage')})")
+                logger.info("Pitch adjusted: %.4fmm → %.4fmm (%s)",
+                           theoretical_pitch, calibrated_pitch, pitch_calibration.reason or 'coverage')
                 
                 # Update analyzer with calibrated pitch
                 self.analyzer.led_placement.led_spacing_mm = calibrated_pitch
-                
-                # Regenerate mapping with adjusted pitch
-                logger.info("STEP 3: Regenerating mapping with adjusted pitch...")
-                final_mapping, final_max_led = self._generate_mapping(
-                    key_geometries, start_led, end_led
-                )
-                logger.info(f"New mapping coverage: max_led={final_max_led}")
             else:
-                logger.info("No pitch adjustment needed, using initial mapping")
-                final_mapping = initial_mapping
+                logger.info("No pitch adjustment needed")
+            
+            # STEP 2: Generate the mapping with the (possibly adjusted) pitch
+            logger.info("STEP 2: Generating mapping...")
+            final_mapping, final_max_led = self._generate_mapping(
+                key_geometries, start_led, end_led, key_extents
+            )
+            coverage_gap = end_led - final_max_led
+            logger.info("Mapping coverage: max_led=%s, end_led=%s, gap=%s", final_max_led, end_led, coverage_gap)
             
             # Get complete analysis
             analysis = self.analyzer.analyze_mapping(
@@ -146,24 +218,24 @@ class PhysicsBasedAllocationService:
                 end_led=end_led,
             )
             
-            # IMPORTANT: Use the pitch_info from STEP 2, not the recalculated one from analyze_mapping
+            # IMPORTANT: Use the pitch calibration from STEP 1, not the recalculated one from analyze_mapping
             # because analyze_mapping recalculates with the updated pitch, losing the "was_adjusted" info
             if was_adjusted:
                 # Override with the actual adjustment that happened
-                analysis['pitch_calibration'] = initial_pitch_info
-                logger.info(f"OVERRIDE: Using pitch calibration from STEP 2: was_adjusted={initial_pitch_info.get('was_adjusted')}, "
-                           f"theoretical={initial_pitch_info.get('theoretical_pitch_mm')}, "
-                           f"calibrated={initial_pitch_info.get('calibrated_pitch_mm')}")
+                analysis['pitch_calibration'] = pitch_calibration._asdict()
+                logger.info("OVERRIDE: Using pitch calibration from STEP 1: was_adjusted=%s, "
+                           "theoretical=%s, calibrated=%s",
+                           was_adjusted, theoretical_pitch, calibrated_pitch)
             else:
-                logger.info(f"NO OVERRIDE: was_adjusted={was_adjusted}, keeping analysis pitch_calibration")
+                logger.info("NO OVERRIDE: was_adjusted=%s, keeping analysis pitch_calibration", was_adjusted)
             
             # Calculate allocation statistics
             led_allocation_stats = self._calculate_stats(final_mapping, start_led, end_led)
             
-            logger.info(f"Physics-based allocation complete: "
-                       f"{led_allocation_stats['total_key_count']} keys, "
-                       f"{led_allocation_stats['total_led_count']} LEDs used, "
-                       f"avg {led_allocation_stats['avg_leds_per_key']:.2f} LEDs/key")
+            logger.info("Physics-based allocation complete: %s keys, %s LEDs used, avg %.2f LEDs/key",
+                       led_allocation_stats['total_key_count'],
+                       led_allocation_stats['total_led_count'],
+                       led_allocation_stats['avg_leds_per_key'])
             
             return {
                 'success': True,
@@ -192,33 +264,10 @@ class PhysicsBasedAllocationService:
                 'message': 'Failed to allocate LEDs using physics-based detection',
             }
     
-    def _get_key_edge_position(self, key_geom, edge: str) -> float:
-        """
-        Get the exposed start or end position of a key.
-        
-        Args:
-            key_geom: Key geometry object
-            edge: 'start' or 'end'
-        
-        Returns:
-            Position in mm
-        """
-        if edge == 'start':
-            return getattr(key_geom, '_exposed_start', key_geom.start_mm)
-        else:
-            return getattr(key_geom, '_exposed_end', key_geom.end_mm)
-    
-    def _get_led_center_position(self, led_idx: int, led_placements: Dict) -> float:
-        """Get the center position of an LED from placements dict."""
-        rel_idx = led_idx  # In led_placements, keys are relative indices
-        if rel_idx in led_placements:
-            return led_placements[rel_idx].center_mm
-        return 0.0
-    
     def _rescue_orphaned_leds(
         self,
         final_mapping: Dict[int, List[int]],
-        key_geometries: Dict,
+        key_extents: Tuple[List[float], List[float]],
         led_placements: Dict,
         start_led: int,
         end_led: int
@@ -231,7 +280,7 @@ class PhysicsBasedAllocationService:
         
         Args:
             final_mapping: Current LED-to-key mapping (will be modified)
-            key_geometries: All 88 key geometries
+            key_extents: Exposed (starts, ends) of all 88 keys, from _key_extents
             led_placements: LED placement data
             start_led: First LED index
             end_led: Last LED index
@@ -241,14 +290,17 @@ class PhysicsBasedAllocationService:
         """
         rescued_led_count = 0
         rescue_stats = {'total_rescued': 0, 'rescued_from_prev': 0, 'rescued_from_next': 0}
+        key_starts, key_ends = key_extents
+        # LED centers keyed by absolute index (placements are keyed relative to start_led)
+        led_centers = {
+            rel_idx + start_led: placement.center_mm for rel_idx, placement in led_placements.items()
+        }
         
         for key_idx in range(88):
             standard_leds = set(final_mapping[key_idx])
-            current_key_geom = key_geometries[key_idx]
             
             # Check gap to previous key
             if key_idx > 0:
-                prev_key_geom = key_geometries[key_idx - 1]
                 prev_leds = set(final_mapping[key_idx - 1])
                 
                 if standard_leds and prev_leds:
@@ -260,23 +312,21 @@ class PhysicsBasedAllocationService:
                         for led_idx in range(max_prev + 1, min_current):
                             if led_idx not in standard_leds and led_idx not in prev_leds:
                                 # Calculate distances
-                                rel_idx = led_idx - start_led
-                                led_center = self._get_led_center_position(rel_idx, led_placements)
+                                led_center = led_centers.get(led_idx, 0.0)
                                 
-                                dist_to_prev = abs(led_center - self._get_key_edge_position(prev_key_geom, 'end'))
-                                dist_to_current = abs(led_center - self._get_key_edge_position(current_key_geom, 'start'))
+                                dist_to_prev = abs(led_center - key_ends[key_idx - 1])
+                                dist_to_current = abs(led_center - key_starts[key_idx])
                                 
                                 # Assign to the closer key (current key in this case since we're checking from current)
                                 if dist_to_current < dist_to_prev:
                                     final_mapping[key_idx].append(led_idx)
                                     rescued_led_count += 1
                                     rescue_stats['rescued_from_prev'] += 1
-                                    logger.debug(f"Rescued LED #{led_idx}: closer to key {key_idx} "
-                                              f"({dist_to_current:.2f}mm) vs prev ({dist_to_prev:.2f}mm)")
+                                    logger.debug("Rescued LED #%s: closer to key %s (%.2fmm) vs prev (%.2fmm)",
+                                              led_idx, key_idx, dist_to_current, dist_to_prev)
             
             # Check gap to next key
             if key_idx < 87:
-                next_key_geom = key_geometries[key_idx + 1]
                 next_leds = set(final_mapping[key_idx + 1])
                 
                 if standard_leds and next_leds:
@@ -288,19 +338,18 @@ class PhysicsBasedAllocationService:
                         for led_idx in range(max_current + 1, min_next):
                             if led_idx not in standard_leds and led_idx not in next_leds:
                                 # Calculate distances
-                                rel_idx = led_idx - start_led
-                                led_center = self._get_led_center_position(rel_idx, led_placements)
+                                led_center = led_centers.get(led_idx, 0.0)
                                 
-                                dist_to_current = abs(led_center - self._get_key_edge_position(current_key_geom, 'end'))
-                                dist_to_next = abs(led_center - self._get_key_edge_position(next_key_geom, 'start'))
+                                dist_to_current = abs(led_center - key_ends[key_idx])
+                                dist_to_next = abs(led_center - key_starts[key_idx + 1])
                                 
                                 # Assign to the closer key
                                 if dist_to_current <= dist_to_next:
                                     final_mapping[key_idx].append(led_idx)
                                     rescued_led_count += 1
                                     rescue_stats['rescued_from_next'] += 1
-                                    logger.debug(f"Rescued LED #{led_idx}: closer to key {key_idx} "
-                                              f"({dist_to_current:.2f}mm) vs next ({dist_to_next:.2f}mm)")
+                                    logger.debug("Rescued LED #%s: closer to key %s (%.2fmm) vs next (%.2fmm)",
+                                              led_idx, key_idx, dist_to_current, dist_to_next)
         
         rescue_stats['total_rescued'] = rescued_led_count
         
@@ -310,7 +359,13 @@ class PhysicsBasedAllocationService:
         
         return final_mapping, rescued_led_count, rescue_stats
     
-    def _generate_mapping(self, key_geometries: Dict, start_led: int, end_led: int) -> tuple:
+    def _generate_mapping(
+        self,
+        key_geometries: Dict,
+        start_led: int,
+        end_led: int,
+        key_extents: Optional[Tuple[List[float], List[float]]] = None,
+    ) -> tuple:
         """
         Generate LED mapping and detect maximum LED coverage.
         
@@ -318,49 +373,95 @@ class PhysicsBasedAllocationService:
         When an LED has equal or near-equal overlap with multiple keys, it's assigned
         to the white key (which is physically farther and visually more prominent).
         
+        Args:
+            key_extents: Precomputed _key_extents(key_geometries), built here if omitted
+        
         Returns:
             Tuple of (mapping_dict, max_led_assigned)
         """
         # Calculate LED placements with current pitch
         usable_led_count = (end_led - start_led) + 1
-        led_placements = self.analyzer.led_placement.calculate_led_placements(
-            led_count=usable_led_count,
-            strip_start_mm=0.0,
-            start_led=0,
-            end_led=usable_led_count - 1,
+        led_placement = self.analyzer.led_placement
+        placement_params = (
+            led_placement.led_spacing_mm,
+            led_placement.led_physical_width,
+            led_placement.led_strip_offset,
+            usable_led_count,
         )
+        led_placements = cached_led_placements(*placement_params)
         
         # Build initial mapping: find overlapping LEDs for each key
         # Also track potential assignments for conflict resolution
         initial_mapping = {}
         led_candidates = {}  # Track all potential keys for each LED
         
+        # LED extents as flat (abs_idx, start, end) rows plus separate edge sequences, cached
+        # with the placements so repeated calls at the same pitch skip rebuilding them.
+        # LEDs run along the strip in index order, so both edges are sorted and each key only
+        # needs the window of LEDs that can reach it (ends >= key start, starts <= key end)
+        led_extents, led_starts, led_ends, leds_sorted = _cached_led_edges(
+            *placement_params, start_led
+        )
+        
+        # Key extents and colors as flat per-key lists (structure of arrays)
+        if key_extents is None:
+            key_extents = _key_extents(key_geometries)
+        key_starts, key_ends = key_extents
+        key_is_white = [key_geometries[key_idx].key_type.value == 'white' for key_idx in range(88)]
+        overhang_threshold = self.overhang_threshold_mm
+        # (key, LED) pairs whose overhang past the key's exposed edges exceeds the threshold,
+        # found in the same sweep as the overlap and dropped after conflict resolution
+        overhang_rejected = set()
+        
+        # Sweep-line window bounds: keys also run along the keyboard in index order, so the
+        # window edges only move forward and are advanced in place. A key whose start or end
+        # steps backwards re-seeks that edge with a binary search.
+        led_total = len(led_extents)
+        window_lo = window_hi = 0
+        prev_key_start = prev_key_end = float('-inf')
+        
         for key_idx in range(88):
-            key_geom = key_geometries[key_idx]
             overlapping_leds = []
+            key_start = key_starts[key_idx]
+            key_end = key_ends[key_idx]
+            is_white_key = key_is_white[key_idx]
             
-            for rel_idx, led_placement in led_placements.items():
-                abs_idx = rel_idx + start_led
-                
-                # Check overlap between key and LED
-                key_start = getattr(key_geom, '_exposed_start', key_geom.start_mm)
-                key_end = getattr(key_geom, '_exposed_end', key_geom.end_mm)
-                
-                led_start = led_placement.start_mm
-                led_end = led_placement.end_mm
-                
-                overlap_start = max(key_start, led_start)
-                overlap_end = min(key_end, led_end)
-                overlap = max(0, overlap_end - overlap_start)
+            if leds_sorted:
+                if key_start < prev_key_start:
+                    window_lo = bisect_left(led_ends, key_start)
+                while window_lo < led_total and led_ends[window_lo] < key_start:
+                    window_lo += 1
+                if key_end < prev_key_end:
+                    window_hi = bisect_right(led_starts, key_end)
+                while window_hi < led_total and led_starts[window_hi] <= key_end:
+                    window_hi += 1
+                prev_key_start = key_start
+                prev_key_end = key_end
+                window = led_extents[window_lo:window_hi]
+            else:
+                window = [extent for extent in led_extents
+                          if extent[2] >= key_start and extent[1] <= key_end]
+            
+            for abs_idx, led_start, led_end in window:
+                # Check overlap between key and LED. Every LED in the window ends at or after
+                # the key start and starts at or before the key end, so the overlap is never
+                # negative and needs no clamp to zero.
+                overlap_start = led_start if led_start > key_start else key_start
+                overlap_end = led_end if led_end < key_end else key_end
+                overlap = overlap_end - overlap_start
                 
                 # Include LED if it overlaps, or if it's at the boundary of a white key
                 # (boundary preference: white keys are physically larger and visually prominent)
-                is_white_key = key_geom.key_type.value == 'white'
-                is_boundary = (led_end == key_start or led_start == key_end) and is_white_key
+                is_boundary = is_white_key and (led_end == key_start or led_start == key_end)
                 
                 if overlap > 0 or is_boundary:
                     overlapping_leds.append(abs_idx)
                     
+                    # Overhang filter (same rule as LEDPhysicalPlacement.analyze_led_coverage):
+                    # positive overhang past either exposed edge must stay within the threshold
+                    if key_start - led_start > overhang_threshold or led_end - key_end > overhang_threshold:
+                        overhang_rejected.add((key_idx, abs_idx))
+                    
                     # Track this LED as a candidate for this key
                     # Use a small penalty for boundary touches vs actual overlap
                     penalty = 0.1 if is_boundary else 0
@@ -372,72 +473,63 @@ class PhysicsBasedAllocationService:
         
         # Resolve conflicts: when an LED has equal overlap with multiple keys, 
         # prefer the white key
-        from backend.config_led_mapping_physical import KeyType
-        
         for led_idx, candidates in led_candidates.items():
             if len(candidates) > 1:
-                # Sort by overlap amount (descending), then by white key preference
-                candidates_sorted = sorted(
+                # Rank by overlap amount (descending), then by white key preference. Only the
+                # winner is needed, so one min() pass replaces sorting the candidate list.
+                best_key = min(
                     candidates,
                     key=lambda x: (
                         -x[1],  # Higher overlap first
-                        key_geometries[x[0]].key_type != KeyType.WHITE,  # White keys (False) before black (True)
+                        not key_is_white[x[0]],  # White keys (False) before black (True)
                         x[0]  # Earlier keys as tiebreaker
                     )
-                )
-                
-                best_key = candidates_sorted[0][0]
-                best_overlap = candidates_sorted[0][1]
+                )[0]
                 
-                # Remove this LED from all other keys' assignments
-                for key_idx in range(88):
-                    if key_idx != best_key and led_idx in initial_mapping[key_idx]:
+                # Remove this LED from all other keys' assignments; the candidates are exactly
+                # the keys that picked it up, so the other 80-odd keys need no membership scan
+                for key_idx, _ in candidates:
+                    if key_idx != best_key:
                         initial_mapping[key_idx].remove(led_idx)
         
-        # Apply overhang filtering
-        final_mapping = {}
-        for key_idx in range(88):
-            key_geom = key_geometries[key_idx]
-            rel_indices = [idx - start_led for idx in initial_mapping[key_idx]]
-            
-            coverage_result = self.analyzer.led_placement.analyze_led_coverage(
-                key_geom,
-                rel_indices,
-                led_placements,
-                overhang_threshold_mm=self.overhang_threshold_mm
-            )
-            
-            filtered_abs = [idx + start_led for idx in coverage_result["filtered_leds"]]
-            final_mapping[key_idx] = filtered_abs
+        # Apply overhang filtering (evaluated during the overlap sweep above). The sweep's
+        # lists are owned by this call, so only keys with rejected LEDs get a filtered copy.
+        final_mapping = initial_mapping
+        for key_idx in {key_idx for key_idx, _ in overhang_rejected}:
+            final_mapping[key_idx] = [
+                idx for idx in final_mapping[key_idx] if (key_idx, idx) not in overhang_rejected
+            ]
         
         # Apply consecutive LED mapping with gap-bridging (rescue orphaned LEDs)
         logger.info("Applying consecutive LED mapping with gap-bridging...")
         final_mapping, rescued_count, rescue_stats = self._rescue_orphaned_leds(
-            final_mapping, key_geometries, led_placements, start_led, end_led
+            final_mapping, key_extents, led_placements, start_led, end_led
         )
-        logger.info(f"Rescued LEDs: total={rescue_stats['total_rescued']}, "
-                   f"from_prev={rescue_stats['rescued_from_prev']}, "
-                   f"from_next={rescue_stats['rescued_from_next']}")
+        logger.info("Rescued LEDs: total=%s, from_prev=%s, from_next=%s",
+                   rescue_stats['total_rescued'],
+                   rescue_stats['rescued_from_prev'],
+                   rescue_stats['rescued_from_next'])
         
-        # Ensure full LED range coverage by extending last key
+        # Ensure full LED range coverage by extending last key.
+        # One pass finds the highest LED assigned and the last key with LEDs (and its highest
+        # LED). Rescued LEDs are appended, so lists are not sorted and max() is still needed.
         max_led_assigned = 0
-        for leds in final_mapping.values():
+        last_key_idx = None
+        last_key_max = start_led
+        for key_idx in range(88):
+            leds = final_mapping[key_idx]
             if leds:
-                max_led_assigned = max(max_led_assigned, max(leds))
+                last_key_idx = key_idx
+                last_key_max = max(leds)
+                if last_key_max > max_led_assigned:
+                    max_led_assigned = last_key_max
         
-        if max_led_assigned < end_led:
-            # Find last key with LEDs and extend it
-            for key_idx in range(87, -1, -1):
-                if final_mapping[key_idx]:
-                    current_leds = final_mapping[key_idx]
-                    max_current = max(current_leds) if current_leds else start_led
-                    
-                    if max_current < end_led:
-                        extended_leds = list(current_leds) + list(range(max_current + 1, end_led + 1))
-                        final_mapping[key_idx] = extended_leds
-                        max_led_assigned = end_led
-                        logger.debug(f"Extended key {key_idx} to reach end_led {end_led}")
-                    break
+        # The last key's highest LED is at most max_led_assigned, so it needs extending too
+        if max_led_assigned < end_led and last_key_idx is not None:
+            # final_mapping's lists are built fresh above, so extend in place
+            final_mapping[last_key_idx].extend(range(last_key_max + 1, end_led + 1))
+            max_led_assigned = end_led
+            logger.debug("Extended key %s to reach end_led %s", last_key_idx, end_led)
         
         return final_mapping, max_led_assigned
     
@@ -445,36 +537,43 @@ class PhysicsBasedAllocationService:
     def _calculate_stats(mapping: Dict[int, List[int]], start_led: int, end_led: int) -> Dict:
         """Calculate allocation statistics including rescued LED metrics."""
         total_keys = len(mapping)
-        total_leds_used = len(set(led for leds in mapping.values() for led in leds))
-        
-        leds_per_key = [len(leds) for leds in mapping.values() if len(leds) > 0]
-        avg_leds_per_key = sum(leds_per_key) / len(leds_per_key) if leds_per_key else 0
         
-        # Count distribution
-        distribution = {}
-        for count in leds_per_key:
-            distribution[str(count)] = distribution.get(str(count), 0) + 1
-        
-        # Count keys with rescued LEDs (keys that had gaps filled)
+        # Single pass over keys 0-87 in order: LEDs-per-key counts and totals, a bitmap of
+        # LEDs in use (mapped LEDs always fall within start_led..end_led, so a flat bytearray
+        # replaces a set of ints), and consecutive coverage between neighboring keys
+        counts = Counter()
+        used_leds = bytearray(end_led + 1)
+        mapped_keys = 0
+        total_assigned = 0
         keys_with_continuous_coverage = 0
-        for key_idx in range(87):
-            current_leds = mapping[key_idx]
-            next_leds = mapping[key_idx + 1]
-            
-            if current_leds and next_leds:
-                max_current = max(current_leds)
-                min_next = min(next_leds)
-                if max_current + 1 == min_next:
+        prev_max_led = None  # Highest LED of the previous key, None if it had no LEDs
+        for key_idx in range(88):
+            leds = mapping[key_idx]
+            led_count = len(leds)
+            if led_count:
+                counts[led_count] += 1
+                mapped_keys += 1
+                total_assigned += led_count
+                for led_idx in leds:
+                    used_leds[led_idx] = 1
+                # Count keys with rescued LEDs (keys that had gaps filled)
+                if prev_max_led is not None and prev_max_led + 1 == min(leds):
                     keys_with_continuous_coverage += 1
+                prev_max_led = max(leds)
+            else:
+                prev_max_led = None
+        
+        avg_leds_per_key = total_assigned / mapped_keys if mapped_keys else 0
+        distribution = {str(count): keys for count, keys in counts.items()}
         
         return {
             'total_key_count': total_keys,
-            'total_led_count': total_leds_used,
-            'mapped_key_count': len([leds for leds in mapping.values() if leds]),
-            'unmapped_key_count': len([leds for leds in mapping.values() if not leds]),
+            'total_led_count': used_leds.count(1),
+            'mapped_key_count': mapped_keys,
+            'unmapped_key_count': total_keys - mapped_keys,
             'avg_leds_per_key': round(avg_leds_per_key, 2),
-            'min_leds_per_key': min(leds_per_key) if leds_per_key else 0,
-            'max_leds_per_key': max(leds_per_key) if leds_per_key else 0,
+            'min_leds_per_key': min(counts) if counts else 0,
+            'max_leds_per_key': max(counts) if counts else 0,
             'leds_per_key_distribution': distribution,
             'led_range': f"{start_led}-{end_led}",
             'total_led_range_available': (end_led - start_led) + 1,
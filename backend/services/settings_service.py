@@ -50,6 +50,7 @@ class SettingsService:
         self.websocket_callback = websocket_callback
         self._defaults_schema = self._get_default_settings_schema()
         self._listeners = []
+        self._settings_version = 0  # Bumped on every write so consumers can cache derived data
         self._init_database()
         self._load_default_settings()
         self._migrate_legacy_keys()
@@ -423,6 +424,11 @@ class SettingsService:
         except Exception as exc:
             logger.error(f"Legacy settings migration failed: {exc}")
 
+    @property
+    def settings_version(self) -> int:
+        """Counter incremented on every setting write; unchanged means no settings changed."""
+        return self._settings_version
+    
     def add_listener(self, callback: Callable[[str, str, Any], None]) -> None:
         """Register a callback to be notified when a setting changes."""
         if callback and callback not in self._listeners:
@@ -526,6 +532,8 @@ class SettingsService:
             if category == 'led' and key == 'leds_per_meter':
                 logger.info(f"Saved to DB: {category}.{storage_key} = {normalized_value}")
             
+            self._settings_version += 1
+            
             # Notify internal listeners before broadcasting
             self._notify_listeners(category, storage_key, normalized_value)
 
@@ -0,0 +1,218 @@
+import os
+import sys
+import tempfile
+import threading
+import types
+from unittest.mock import Mock, patch
+
+import pytest
+from flask import Flask
+
+import backend.services.led_selection_service as led_selection_module
+from backend.api.led_selection import led_selection_bp
+from backend.config import get_canonical_led_mapping
+from backend.services.led_selection_service import LEDSelectionService, get_led_selection_service
+from backend.services.settings_service import SettingsService
+
+
+@pytest.fixture
+def settings_service():
+    """Settings service backed by a throwaway database"""
+    with tempfile.TemporaryDirectory() as temp_dir:
+        yield SettingsService(db_path=os.path.join(temp_dir, 'settings.db'))
+
+
+def _override_reads(get_setting_mock):
+    """Number of times the overrides setting was read from the settings service"""
+    return sum(1 for call in get_setting_mock.call_args_list
+               if call.args[:2] == ('calibration', 'led_selection_overrides'))
+
+
+class TestLEDSelectionService:
+    """Test cases for the LED selection override cache and writes"""
+
+    def test_overrides_cached_until_settings_version_changes(self, settings_service):
+        """Test overrides are re-read only after a settings write"""
+        service = LEDSelectionService(settings_service)
+        service.set_key_led_selection(60, [10, 11])
+
+        with patch.object(settings_service, 'get_setting', wraps=settings_service.get_setting) as get_setting:
+            assert service.get_key_led_selection(60)['selected_leds'] == [10, 11]
+            assert service.get_key_led_selection(60)['selected_leds'] == [10, 11]
+            assert _override_reads(get_setting) == 0
+
+            # A write from elsewhere bumps settings_version and invalidates the cache
+            settings_service.set_setting('calibration', 'led_selection_overrides', {'60': [12]})
+            assert service.get_key_led_selection(60)['selected_leds'] == [12]
+            assert _override_reads(get_setting) == 1
+
+    def test_writes_do_not_mutate_loaded_overrides(self, settings_service):
+        """Test readers keep a consistent snapshot while writers save a copy"""
+        service = LEDSelectionService(settings_service)
+        service.set_key_led_selection(60, [10])
+        snapshot = service._load_overrides()
+
+        service.set_key_led_selection(61, [12])
+        service.toggle_led_selection(60, 11)
+        service.clear_key_led_selection(60)
+
+        assert snapshot == {60: [10]}
+        assert service._load_overrides() == {61: [12]}
+
+    def test_selections_are_stored_sorted(self, settings_service):
+        """Test selections are kept sorted so toggles work on the stored order"""
+        service = LEDSelectionService(settings_service)
+        service.set_key_led_selection(60, [12, 10, 11])
+        assert service.get_key_led_selection(60)['selected_leds'] == [10, 11, 12]
+
+        assert service.toggle_led_selection(60, 11)['selected_leds'] == [10, 12]
+        assert service.toggle_led_selection(60, 11)['selected_leds'] == [10, 11, 12]
+
+        # Unsorted selections saved by older versions are sorted when loaded
+        settings_service.set_setting('calibration', 'led_selection_overrides', {'61': [5, 3]})
+        assert service.toggle_led_selection(61, 4)['selected_leds'] == [3, 4, 5]
+
+    def test_apply_overrides_inplace_matches_copy(self, settings_service):
+        """Test applying overrides in place gives the same mapping as on a copy"""
+        service = LEDSelectionService(settings_service)
+        service.set_multiple_key_selections({21: [4], 23: [10]})
+
+        copied = service.apply_overrides_to_mapping({0: [4, 5, 6], 1: [7, 8], 2: [9, 10]})
+        base_mapping = {0: [4, 5, 6], 1: [7, 8], 2: [9, 10]}
+        in_place = service.apply_overrides_to_mapping(base_mapping, inplace=True)
+
+        assert in_place is base_mapping
+        assert in_place == copied
+        assert copied[0] == [4] and copied[2] == [10]
+
+    def test_apply_overrides_inplace_failure_leaves_mapping_unchanged(self, settings_service):
+        """Test an override that fails part-way does not half-apply to the caller's mapping"""
+        service = LEDSelectionService(settings_service)
+        base_mapping = {0: [4, 5, 6], 1: [7, 8], 2: [9, 10]}
+
+        with patch.object(service, '_load_overrides', return_value={21: [4], 23: [10, 'x']}):
+            result = service.apply_overrides_to_mapping(base_mapping, inplace=True)
+
+        assert result == {0: [4, 5, 6], 1: [7, 8], 2: [9, 10]}
+        assert base_mapping == {0: [4, 5, 6], 1: [7, 8], 2: [9, 10]}
+
+    def test_concurrent_writes_are_not_lost(self, settings_service):
+        """Test concurrent single-key writes each end up in the saved overrides"""
+        service = LEDSelectionService(settings_service)
+        threads = [
+            threading.Thread(target=service.set_key_led_selection, args=(midi_note, [midi_note]))
+            for midi_note in range(21, 41)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        service.clear_cache()
+        assert service._load_overrides() == {midi_note: [midi_note] for midi_note in range(21, 41)}
+
+    def test_set_multiple_key_selections_writes_once(self, settings_service):
+        """Test a multi-key update saves valid keys in one write and reports invalid ones"""
+        service = LEDSelectionService(settings_service)
+
+        with patch.object(settings_service, 'set_setting', wraps=settings_service.set_setting) as set_setting:
+            result = service.set_multiple_key_selections({60: [10], 61: [11], 200: [12]})
+
+        assert set_setting.call_count == 1
+        assert result['saved'] is True
+        assert result['success'] is False
+        assert result['results'][60]['success'] and result['results'][61]['success']
+        assert not result['results'][200]['success']
+
+        service.clear_cache()
+        assert service._load_overrides() == {60: [10], 61: [11]}
+
+    def test_set_multiple_key_selections_reports_failed_save(self, settings_service):
+        """Test a failed settings write is reported and leaves the overrides unchanged"""
+        service = LEDSelectionService(settings_service)
+        service.set_key_led_selection(60, [10])
+
+        with patch.object(settings_service, 'set_setting', return_value=False):
+            result = service.set_multiple_key_selections({60: [20], 61: [21]})
+
+        assert result['success'] is False
+        assert result['saved'] is False
+        assert service.get_key_led_selection(60)['selected_leds'] == [10]
+        assert service.get_key_led_selection(61)['selected_leds'] == []
+
+
+class TestSharedLEDSelectionService:
+    """Test cases for the shared LED selection service"""
+
+    @pytest.fixture(autouse=True)
+    def reset_shared_service(self):
+        with patch.object(led_selection_module, '_selection_service', None):
+            yield
+
+    def test_shared_per_settings_service(self, settings_service):
+        """Test one service is shared per settings service"""
+        service = get_led_selection_service(settings_service)
+        assert get_led_selection_service(settings_service) is service
+
+        other_settings = Mock()
+        assert get_led_selection_service(other_settings).settings_service is other_settings
+
+    def test_canonical_mapping_reuses_overrides_cache(self, settings_service):
+        """Test repeated canonical mapping builds read the overrides only once"""
+        get_led_selection_service(settings_service).set_key_led_selection(60, [100])
+        get_led_selection_service(settings_service).clear_cache()
+
+        with patch.object(settings_service, 'get_setting', wraps=settings_service.get_setting) as get_setting:
+            first = get_canonical_led_mapping(settings_service)
+            second = get_canonical_led_mapping(settings_service)
+
+        assert first['success'] and second['success']
+        assert first['mapping'] == second['mapping']
+        assert first['mapping'][60 - 21] == [100]
+        assert _override_reads(get_setting) == 1
+
+
+class TestLEDSelectionAPI:
+    """Test cases for the multi-key LED selection endpoint"""
+
+    @pytest.fixture(autouse=True)
+    def client(self, settings_service):
+        app = Flask(__name__)
+        app.register_blueprint(led_selection_bp)
+        self.settings_service = settings_service
+        self.socketio = Mock()
+        fake_app_module = types.SimpleNamespace(settings_service=settings_service, socketio=self.socketio)
+        with patch.dict(sys.modules, {'backend.app': fake_app_module}), \
+                patch.object(led_selection_module, '_selection_service', None):
+            self.client = app.test_client()
+            yield
+
+    def test_set_multiple_keys(self):
+        """Test the endpoint saves every key and broadcasts each one"""
+        response = self.client.put('/api/led-selection/keys',
+                                   json={'selections': {'60': [10], '61': [11, 12]}})
+
+        assert response.status_code == 200
+        assert response.get_json()['success'] is True
+        assert self.socketio.emit.call_count == 2
+        saved = self.settings_service.get_setting('calibration', 'led_selection_overrides')
+        assert saved == {'60': [10], '61': [11, 12]}
+
+    def test_set_multiple_keys_rejects_bad_payload(self):
+        """Test non-object selections and non-numeric notes are rejected"""
+        response = self.client.put('/api/led-selection/keys', json={'selections': [1, 2]})
+        assert response.status_code == 400
+
+        response = self.client.put('/api/led-selection/keys', json={'selections': {'C4': [1]}})
+        assert response.status_code == 400
+        assert not self.socketio.emit.called
+
+    def test_set_multiple_keys_save_failure(self):
+        """Test a failed settings write returns an error and broadcasts nothing"""
+        with patch.object(self.settings_service, 'set_setting', return_value=False):
+            response = self.client.put('/api/led-selection/keys',
+                                       json={'selections': {'60': [10]}})
+
+        assert response.status_code == 500
+        assert response.get_json()['saved'] is False
+        assert not self.socketio.emit.called
@@ -1,8 +1,9 @@
 import pytest
 import os
 import tempfile
+import threading
 from unittest.mock import Mock, patch
-from playback_service import PlaybackService, PlaybackState, NoteEvent
+from playback_service import PlaybackService, PlaybackState, NoteEvent, TimestampedNoteBuffer, _mask_to_notes
 
 
 class TestPlaybackService:
@@ -40,6 +41,28 @@ class TestPlaybackService:
         assert self.service.notes == []
         assert self.service.filename is None
     
+    def test_settings_loaders_fetch_each_category_once(self):
+        """Test settings loaders read whole categories instead of querying key by key"""
+        categories = {
+            'led': {'mapping_mode': 'auto', 'leds_per_key': 2},
+            'learning_mode': {'left_hand_wait_for_notes': True, 'timing_window_ms': 250},
+        }
+        self.mock_settings_service.get_category_settings = Mock(
+            side_effect=lambda category: categories.get(category, {})
+        )
+        self.mock_settings_service.get_setting.reset_mock()
+
+        self.service._load_settings_from_service()
+        self.service._load_learning_mode_settings()
+
+        assert self.service.leds_per_key == 2
+        assert self.service._learning_config.wait_for_left is True
+        assert self.service._learning_config.timing_window_ms == 250
+        fetched = [c.args[0] for c in self.mock_settings_service.get_category_settings.call_args_list]
+        assert sorted(fetched) == ['learning_mode', 'led', 'piano']
+        # Only the category that came back empty is read key by key
+        assert {c.args[0] for c in self.mock_settings_service.get_setting.call_args_list} == {'piano'}
+
     def test_load_midi_file_success(self):
         """Test successful MIDI file loading"""
         # Create a temporary file to simulate MIDI file
@@ -147,6 +170,165 @@ class TestPlaybackService:
         assert status.filename is None
         assert status.error_message is None
     
+    def test_status_callback_reuses_status_view(self):
+        """Test status callbacks receive a pooled view that can be snapshotted"""
+        received = []
+        self.service.add_status_callback(received.append)
+        
+        self.service._current_time = 1.0
+        self.service._total_duration = 4.0
+        self.service._emit_status()
+        snapshot = received[0].snapshot()
+        self.service._current_time = 2.0
+        self.service._emit_status()
+        
+        assert received[0] is received[1]
+        assert received[1].progress_percentage == 50.0
+        assert snapshot.current_time == 1.0
+        assert snapshot.progress_percentage == 25.0
+    
+    def test_status_notifications_are_asynchronous(self):
+        """Test status changes are delivered by the notifier thread"""
+        delivered = threading.Event()
+        self.service.add_status_callback(lambda status: delivered.set())
+        
+        self.service._notify_status_change()
+        
+        assert delivered.wait(1.0)
+        assert self.service._status_thread is not threading.current_thread()
+
+    def test_cleanup_stops_status_notifier(self):
+        """Test cleanup signals the notifier thread and joins it"""
+        statuses = []
+        self.service.add_status_callback(lambda status: statuses.append(status.state))
+        self.service._notify_status_change()
+        notifier = self.service._status_thread
+        
+        self.service.cleanup()
+        
+        assert not notifier.is_alive()
+        assert self.service._status_thread is None
+        assert statuses[-1] == PlaybackState.STOPPED
+    
+    def test_queued_notes_window_and_cleanup(self):
+        """Test learning-mode queue window lookup and stale-note cleanup"""
+        self.service._learning_config.enabled = True
+        for timestamp, note, hand in [(0.1, 40, 'left'), (0.5, 60, 'right'),
+                                      (1.0, 62, 'right'), (1.2, 45, 'left'), (6.0, 64, 'right')]:
+            self.service._current_time = timestamp
+            self.service.record_midi_note_played(note, hand)
+        
+        assert self.service._get_queued_notes_in_window(0.5, 1.2) == ([45], [60, 62])
+        
+        self.service._current_time = 6.0
+        self.service._learning_config.queue_max_age = 5.0
+        self.service._cleanup_old_queued_notes()
+        left_queue, right_queue = self.service._hand_queues
+        assert left_queue.latest(5) == [(45, 1.2)]
+        assert right_queue.latest(5) == [(62, 1.0), (64, 6.0)]
+    
+    def test_expected_notes_fast_lookup(self):
+        """Test per-bin expected-note masks match the events in the window"""
+        self.service._note_events = [
+            NoteEvent(time=0.0, note=40, velocity=80, duration=0.5),
+            NoteEvent(time=0.1, note=72, velocity=80, duration=0.5),
+            NoteEvent(time=0.2, note=100, velocity=80, duration=0.5),
+            NoteEvent(time=3.0, note=59, velocity=80, duration=0.5),
+        ]
+        self.service._precompute_expected_notes()
+        
+        assert self.service._get_expected_notes_fast(-1.0, 0.5) == ({40}, {72, 100})
+        assert self.service._get_expected_notes_fast(2.0, 3.5) == ({59}, set())
+        assert self.service._get_expected_notes_fast(10.0, 11.0) == (set(), set())
+        assert self.service._get_expected_notes_exact(0.0, 0.2) == ({40}, {72})
+    
+    def test_process_note_events_cursor(self):
+        """Test note events fire once, in order, and the cursor follows seeks"""
+        self.service._note_events = [
+            NoteEvent(time=0.0, note=60, velocity=80, duration=0.5),
+            NoteEvent(time=0.5, note=64, velocity=80, duration=0.5),
+            NoteEvent(time=1.0, note=67, velocity=80, duration=0.5),
+        ]
+        self.service._total_duration = 1.5
+        self.service._reset_event_cursor()
+        
+        self.service._current_time = 0.0
+        self.service._process_note_events()
+        assert _mask_to_notes(self.service._active_mask) == {60}
+        
+        self.service._current_time = 0.51
+        self.service._process_note_events()
+        assert _mask_to_notes(self.service._active_mask) == {64}
+        assert self.service._next_note_end == pytest.approx(1.01)
+        assert self.service._next_event_idx == 2
+        
+        self.service.seek_to_time(0.0)
+        assert self.service._next_event_idx == 0
+
+    def test_process_note_events_repeated_note(self):
+        """Test a back-to-back repeat of a sounding pitch re-triggers it instead of being skipped"""
+        sent = []
+        self.service._midi_output_enabled = True
+        self.service._midi_output_service = Mock()
+        self.service._send_midi_batch = sent.extend
+        self.service._note_events = [
+            NoteEvent(time=0.0, note=60, velocity=80, duration=0.5),
+            NoteEvent(time=0.5, note=60, velocity=80, duration=0.5),
+        ]
+        self.service._total_duration = 1.0
+        self.service._reset_event_cursor()
+
+        # The first note started late, so it is still sounding when the repeat is due
+        for current_time in (0.01, 0.49, 0.6, 1.0):
+            self.service._current_time = current_time
+            self.service._process_note_events()
+
+        assert [(kind, note) for kind, note, _ in sent] == [
+            ('note_on', 60), ('note_off', 60), ('note_on', 60), ('note_off', 60)
+        ]
+        assert self.service._active_mask == 0
+
+    def test_convert_parsed_notes_overlaps(self):
+        """Duplicate note_ons are dropped and re-triggers close the pending note"""
+        notes = self.service._convert_parsed_notes({
+            'events': [
+                {'time': 0, 'note': 60, 'velocity': 80, 'type': 'on'},
+                {'time': 0, 'note': 60, 'velocity': 70, 'type': 'on'},
+                {'time': 400, 'note': 60, 'velocity': 90, 'type': 'on'},
+                {'time': 600, 'note': 60, 'velocity': 0, 'type': 'off'},
+                {'time': 800, 'note': 60, 'velocity': 0, 'type': 'off'},
+            ]
+        })
+        
+        assert [(n.time, n.velocity, n.duration) for n in notes] == [(0.0, 80, 0.4), (0.4, 90, pytest.approx(0.2))]
+    
+    def test_learning_mode_render_skips_unchanged_frames(self):
+        """Test learning-mode LED frames are only re-sent when their inputs change"""
+        from playback_service import LearningDisplayState
+        
+        def render(played_left):
+            self.service._render_learning_mode_leds(LearningDisplayState(
+                expected_left={21}, expected_right={30}, wrong_notes=set(),
+                current_time=5.0, last_flash_time=-1.0, flash_duration=0.3,
+                played_left=played_left, played_right=set()))
+        
+        render(set())
+        render({40})  # Unexpected played note does not change the frame
+        assert self.mock_led_controller.set_multiple_leds.call_count == 1
+        
+        render({21})
+        assert self.mock_led_controller.set_multiple_leds.call_count == 2
+    
+    def test_update_leds_skips_unchanged_note_set(self):
+        """Test playback LED frames are only re-rendered when the note set or volume changes"""
+        self.service._update_leds([60, 64])
+        self.service._update_leds([64, 60])
+        assert self.mock_led_controller.set_multiple_leds.call_count == 1
+        
+        self.service.set_volume(0.5)
+        self.service._update_leds([60, 64])
+        assert self.mock_led_controller.set_multiple_leds.call_count == 2
+
     def test_note_to_led_mapping(self):
         """Test MIDI note to LED index mapping"""
         # Test various MIDI notes
@@ -161,6 +343,55 @@ class TestPlaybackService:
         assert led_index_21 == 0  # Lowest note maps to LED 0
         assert led_index_108 == 29  # Highest note maps to LED 29
     
+    def test_note_to_leds_table(self):
+        """Test cached note-to-LED table lookups"""
+        leds = self.service._map_note_to_leds_cached(60)
+        assert isinstance(leds, tuple)
+        assert leds and all(0 <= idx < 30 for idx in leds)
+        # Out-of-range and unmapped notes return an empty tuple
+        assert self.service._map_note_to_leds_cached(0) == ()
+        assert self.service._map_note_to_leds_cached(200) == ()
+        # Contiguous LED runs cover exactly the note's LEDs as frame byte slices
+        runs = self.service._note_led_runs[60]
+        covered = [idx for start, end, count in runs for idx in range(start // 3, end // 3)]
+        assert covered == list(leds) and sum(count for _, _, count in runs) == len(leds)
+    
+    def test_mapping_csr_matches_precomputed_mapping(self):
+        """Test CSR mapping slices hold each note's bounds-filtered LEDs"""
+        self.service._precomputed_mapping = {60: [5, 6, 40], 61: [7]}
+        self.service._build_mapping_csr()
+        
+        assert list(self.service._map_note_to_leds(60)) == [5, 6]
+        assert list(self.service._map_note_to_leds(61)) == [7]
+        assert self.service._mapping_offsets[128] == len(self.service._mapping_leds) == 3
+
+    def test_single_led_mapping_uses_specialized_lookup(self):
+        """Test one-LED-per-key mappings switch to the specialized lookup and back"""
+        self.service._precomputed_mapping = {60: [5], 61: [40], 62: [7]}
+        self.service._build_mapping_csr()
+
+        assert self.service._single_note_leds is not None
+        assert list(self.service._map_note_to_leds(60)) == [5]
+        assert list(self.service._map_note_to_leds(62)) == [7]
+
+        self.service._precomputed_mapping = {60: [5, 6]}
+        self.service._build_mapping_csr()
+        assert self.service._single_note_leds is None
+        assert list(self.service._map_note_to_leds(60)) == [5, 6]
+
+    def test_canonical_mapping_cached_per_settings_version(self):
+        """Test the canonical LED mapping is only regenerated after a settings write"""
+        self.mock_settings_service.settings_version = 1
+        canonical_result = {'success': True, 'mapping': {39: [10, 11]}}
+        with patch('playback_service.get_canonical_led_mapping', return_value=canonical_result) as canonical:
+            assert self.service._generate_key_mapping() == {60: (10, 11)}
+            self.service._generate_key_mapping()
+            assert canonical.call_count == 1
+            
+            self.mock_settings_service.settings_version = 2
+            self.service._generate_key_mapping()
+            assert canonical.call_count == 2
+    
     def test_note_to_color_mapping(self):
         """Test MIDI note to color mapping"""
         color = self.service._get_note_color(60)  # Middle C
@@ -171,10 +402,35 @@ class TestPlaybackService:
     def test_update_leds_with_active_notes(self):
         """Test LED updates with active notes"""
         # Add some active notes to the service
-        self.service._active_notes = {60: 1.0, 64: 0.8}
+        self.service._active_mask = (1 << 60) | (1 << 64)
         
         self.service._update_leds()
         
-        # Verify LED controller was called
-        assert self.mock_led_controller.turn_off_all.called
-        assert self.mock_led_controller.set_multiple_leds.called
\ No newline at end of file
+        # Verify a single diff-based write, without clearing the strip first
+        assert not self.mock_led_controller.turn_off_all.called
+        assert self.mock_led_controller.set_multiple_leds.call_count == 1
+
+
+class TestTimestampedNoteBuffer:
+    """Test cases for the learning-mode played-note buffer"""
+    
+    def test_eviction_and_compaction(self):
+        """Test the buffer stays bounded and keeps the newest notes"""
+        buffer = TimestampedNoteBuffer(maxlen=3)
+        for i in range(3000):
+            buffer.append(i % 128, i * 0.01)
+        assert len(buffer) == 3
+        assert [note for note, _ in buffer.latest(3)] == [(2997 + k) % 128 for k in range(3)]
+    
+    def test_out_of_order_and_discard(self):
+        """Test out-of-order timestamps stay sorted and notes can be discarded"""
+        buffer = TimestampedNoteBuffer()
+        buffer.append(60, 1.0)
+        buffer.append(62, 2.0)
+        buffer.append(64, 1.5)
+        assert buffer.window(0.0, 3.0) == [60, 64, 62]
+        
+        assert buffer.discard_notes((1 << 60) | (1 << 62)) == 2
+        assert buffer.window(0.0, 3.0) == [64]
+        assert buffer.drop_before(2.0) == 1
+        assert len(buffer) == 0
@@ -238,6 +238,48 @@ class USBMIDIOutputService:
             logger.error(f"Failed to send MIDI note_off: {e}")
             return False
 
+    def send_batch(self, events: List[tuple], channel: int = 0) -> int:
+        """
+        Send several note messages under a single port lock.
+
+        Args:
+            events: Sequence of ('note_on', note, velocity) / ('note_off', note, velocity) tuples
+            channel: MIDI channel (0-15)
+
+        Returns:
+            int: Number of messages sent
+        """
+        if not events:
+            return 0
+        if not self.is_connected:
+            logger.debug(f"MIDI output not connected, ignoring batch of {len(events)} messages")
+            return 0
+
+        try:
+            channel = max(0, min(15, channel))
+            messages = []
+            for kind, note, velocity in events:
+                note = max(0, min(127, note))
+                if kind == 'note_on':
+                    messages.append(mido.Message('note_on', note=note, velocity=max(0, min(127, velocity)), channel=channel))
+                else:
+                    messages.append(mido.Message('note_off', note=note, channel=channel))
+
+            sent = 0
+            with self._lock:
+                if self._output_port:
+                    send = self._output_port.send
+                    for msg in messages:
+                        send(msg)
+                        sent += 1
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug(f"Sent MIDI batch: {sent} messages, channel={channel}")
+            return sent
+
+        except Exception as e:
+            logger.error(f"Failed to send MIDI batch: {e}")
+            return 0
+
     def send_control_change(self, control: int, value: int, channel: int = 0) -> bool:
         """
         Send MIDI control change message.